@@ -13,8 +13,12 @@ Runs the complete benchmark pipeline:
 """
 
 import argparse
+import asyncio
+import hashlib
 import subprocess
 import sys
+import tempfile
+import threading
 from datetime import datetime
 from pathlib import Path
 
@@ -22,7 +26,7 @@ from pathlib import Path
 # (benchmark/src is loaded as the 'src' package from CWD=benchmark/)
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.api_client import LLMClient
+from src.batch_inference import BatchInferenceEngine
 from src.checkpoint_manager import CheckpointManager
 from src.config import (
     DEFAULT_PROVIDER,
@@ -38,7 +42,6 @@ from src.inference_engine import InferenceEngine
 from src.logger_config import get_logger, setup_logger
 from src.post_processor import process_responses_file
 from src.prompt_generator import generate_prompts_from_file
-from src.sequel2sql_client import Sequel2SQLClient
 from src.ui import (
     ask_provider,
     ask_subset_size,
@@ -57,6 +60,75 @@ from src.ui import (
     show_run_details_and_confirm,
 )
 
+# Digest of the Docker build inputs used for the current images
+DOCKER_DIGEST_FILE = ".docker_build_digest"
+
+# Upper bound for the evaluation run inside the container (seconds)
+EVALUATION_TIMEOUT = 7200  # 2 hours
+
+
+def count_lines(path: Path) -> int:
+    """
+    Count lines in a file by scanning 1 MiB binary chunks for newlines.
+
+    Args:
+        path: File to count
+
+    Returns:
+        Number of lines (a final line without a trailing newline counts)
+    """
+    count = 0
+    last_chunk = b""
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            count += chunk.count(b"\n")
+            last_chunk = chunk
+    if last_chunk and not last_chunk.endswith(b"\n"):
+        count += 1
+    return count
+
+
+def file_digest(path: Path) -> str:
+    """
+    Hash a file's contents without loading it into memory.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def uses_batch_api(
+    model_config: dict,
+    query_limit: int | None,
+    checkpoint_manager: CheckpointManager | None = None,
+) -> bool:
+    """
+    Decide whether inference goes through the provider Batch API.
+
+    Complete runs (no query limit) use it when the provider supports it; a
+    resumed run with a submitted batch job re-polls that job.
+
+    Args:
+        model_config: Model configuration for the run
+        query_limit: Query limit, or None for a complete run
+        checkpoint_manager: The run's checkpoint manager, if it already exists
+
+    Returns:
+        True if the run uses the Batch API
+    """
+    return bool(
+        model_config.get("supports_batch")
+        and (
+            query_limit is None
+            or (checkpoint_manager and checkpoint_manager.get_batch_job_id())
+        )
+    )
+
 
 def check_docker():
     """
@@ -74,41 +146,86 @@ def check_docker():
         return False
 
 
-def start_docker_containers():
+def docker_build_digest(benchmark_dir: Path) -> str:
+    """
+    Hash the Docker build inputs (compose file and everything in env/).
+
+    Args:
+        benchmark_dir: Benchmark root directory
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    build_files = [benchmark_dir / "docker-compose.yml"]
+    build_files += sorted(p for p in (benchmark_dir / "env").iterdir() if p.is_file())
+    for path in build_files:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def start_docker_containers(rebuild: bool = False):
     """
     Start Docker containers for evaluation.
 
+    Running containers are reused as long as the Docker build inputs are
+    unchanged since the last build; images are only rebuilt when those
+    inputs change or when rebuild is requested.
+
+    Args:
+        rebuild: Force an image rebuild
+
     Returns:
         True if successful, False otherwise
     """
     logger = get_logger()
     benchmark_dir = get_benchmark_dir()
+    digest_file = benchmark_dir / DOCKER_DIGEST_FILE
 
     logger.info("Starting Docker containers...")
 
     try:
+        current_digest = docker_build_digest(benchmark_dir)
+        images_current = (
+            digest_file.exists() and digest_file.read_text().strip() == current_digest
+        )
+
         # Check if containers are already running
         result = subprocess.run(
-            ["docker", "ps", "--format", "{{.Names}}"],
+            [
+                "docker",
+                "inspect",
+                "-f",
+                "{{.State.Running}}",
+                "sequel2sql_postgresql",
+                "sequel2sql_eval",
+            ],
             capture_output=True,
             text=True,
             cwd=benchmark_dir,
             timeout=10,
         )
+        running = result.returncode == 0 and result.stdout.split() == ["true", "true"]
 
-        running_containers = result.stdout.strip().split("\n")
-
-        if (
-            "sequel2sql_postgresql" in running_containers
-            and "sequel2sql_eval" in running_containers
-        ):
+        if running and images_current and not rebuild:
             logger.info("✓ Docker containers already running")
             return True
 
-        # Start containers
-        logger.info("Building and starting containers (this may take a few minutes)...")
+        # Start containers, rebuilding only when the build inputs changed.
+        # --wait blocks until the compose healthcheck reports PostgreSQL healthy
+        cmd = ["docker", "compose", "up", "-d", "--wait", "--wait-timeout", "60"]
+        if rebuild or not images_current:
+            logger.info(
+                "Building and starting containers (this may take a few minutes)..."
+            )
+            cmd.append("--build")
+        else:
+            logger.info("Starting existing containers...")
+
+        logger.info("Waiting for PostgreSQL to be ready...")
         result = subprocess.run(
-            ["docker", "compose", "up", "-d", "--build"],
+            cmd,
             capture_output=True,
             text=True,
             cwd=benchmark_dir,
@@ -116,27 +233,15 @@ def start_docker_containers():
         )
 
         if result.returncode != 0:
-            logger.error(f"Failed to start Docker containers: {result.stderr}")
-            return False
-
-        # Wait for PostgreSQL to be healthy
-        logger.info("Waiting for PostgreSQL to be ready...")
-        for i in range(30):
-            result = subprocess.run(
-                ["docker", "exec", "sequel2sql_postgresql", "pg_isready", "-U", "root"],
-                capture_output=True,
-                text=True,
-                timeout=5,
+            logger.error(
+                f"Failed to start Docker containers or PostgreSQL did not become "
+                f"healthy in time: {result.stderr}"
             )
-            if result.returncode == 0:
-                logger.info("✓ PostgreSQL is ready")
-                return True
-            import time
-
-            time.sleep(2)
+            return False
 
-        logger.error("PostgreSQL failed to become ready in time")
-        return False
+        digest_file.write_text(current_digest)
+        logger.info("✓ PostgreSQL is ready")
+        return True
 
     except subprocess.TimeoutExpired:
         logger.error("Docker operation timed out")
@@ -170,6 +275,7 @@ def run_evaluation(final_output_path: Path, output_dir: Path, num_threads: int =
             "exec",
             "sequel2sql_eval",
             "python",
+            "-u",  # unbuffered, so output streams while the run is in progress
             "src/wrapper_evaluation_postgresql.py",
             "--jsonl_file",
             str(final_output_path.relative_to(benchmark_dir)),
@@ -181,30 +287,49 @@ def run_evaluation(final_output_path: Path, output_dir: Path, num_threads: int =
             "true",
         ]
 
-        result = subprocess.run(
-            cmd,
-            cwd=benchmark_dir,
-            capture_output=True,
-            text=True,
-            timeout=7200,  # 2 hours max
-        )
+        # Stream stdout into the log as it arrives instead of buffering the
+        # whole run; stderr (tqdm progress, tracebacks) goes to a temp file
+        # and is only logged on failure
+        with tempfile.TemporaryFile(mode="w+") as stderr_file:
+            process = subprocess.Popen(
+                cmd,
+                cwd=benchmark_dir,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                text=True,
+                bufsize=1,
+            )
 
-        if result.returncode != 0:
-            logger.error(f"Evaluation failed: {result.stderr}")
-            return False
+            timed_out = threading.Event()
 
-        # Log output
-        logger.info("Evaluation output:")
-        for line in result.stdout.strip().split("\n"):
-            if line.strip():
-                logger.info(f"  {line}")
+            def kill_on_timeout():
+                timed_out.set()
+                process.kill()
+
+            timer = threading.Timer(EVALUATION_TIMEOUT, kill_on_timeout)
+            timer.start()
+
+            try:
+                logger.info("Evaluation output:")
+                for line in process.stdout:
+                    if line.strip():
+                        logger.info(f"  {line.rstrip()}")
+                returncode = process.wait()
+            finally:
+                timer.cancel()
+
+            if timed_out.is_set():
+                logger.error("Evaluation timed out after 2 hours")
+                return False
+
+            if returncode != 0:
+                stderr_file.seek(0)
+                logger.error(f"Evaluation failed: {stderr_file.read()}")
+                return False
 
         logger.info("✓ Evaluation complete")
         return True
 
-    except subprocess.TimeoutExpired:
-        logger.error("Evaluation timed out after 2 hours")
-        return False
     except Exception as e:
         logger.error(f"Error running evaluation: {e}")
         return False
@@ -226,13 +351,24 @@ def main():
     parser.add_argument(
         "--provider",
         type=str,
-        default=DEFAULT_PROVIDER,
+        default=None,
         choices=list(PROVIDERS.keys()),
-        help=f"LLM provider to use. Choices: {', '.join(PROVIDERS.keys())}. Default: {DEFAULT_PROVIDER}",
+        help=f"LLM provider to use. Choices: {', '.join(PROVIDERS.keys())}. If not provided, UI will prompt (default: {DEFAULT_PROVIDER}).",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild the Docker images even if the build files are unchanged.",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse LLM responses cached in outputs/prompt_cache instead of calling the LLM again (off by default, so runs measure live calls).",
     )
     args = parser.parse_args()
+
     # provider may be overridden interactively below when None
-    cli_provider = args.provider if "--provider" in " ".join(sys.argv[1:]) else None
+    cli_provider = args.provider
     provider = cli_provider or DEFAULT_PROVIDER
 
     # ========== Validate Configuration ==========
@@ -252,11 +388,9 @@ def main():
 
     # Load dataset to get total count
     data_file = get_data_dir() / "postgresql_full.jsonl"
-    import json
     import shutil
 
-    with open(data_file, "r") as f:
-        total_available_queries = sum(1 for _ in f)
+    total_available_queries = count_lines(data_file)
 
     # ========== Main Menu Loop ==========
     query_limit = args.limit  # From command line
@@ -287,7 +421,9 @@ def main():
         total_queries = min(query_limit, total_available_queries)
         logger.info(f"⚠️  Running SUBSET MODE with {total_queries} queries")
 
-        display_config_summary(model_config, total_queries)
+        display_config_summary(
+            model_config, total_queries, uses_batch_api(model_config, query_limit)
+        )
 
         if not confirm_start():
             logger.info("User cancelled. Exiting...")
@@ -331,7 +467,11 @@ def main():
                 total_queries = total_available_queries
                 logger.info(f"Running FULL benchmark with {total_queries} queries")
 
-                display_config_summary(model_config, total_queries)
+                display_config_summary(
+                    model_config,
+                    total_queries,
+                    uses_batch_api(model_config, query_limit),
+                )
 
                 if not confirm_start():
                     continue
@@ -370,7 +510,11 @@ def main():
                 total_queries = min(query_limit, total_available_queries)
                 logger.info(f"⚠️  Running SUBSET MODE with {total_queries} queries")
 
-                display_config_summary(model_config, total_queries)
+                display_config_summary(
+                    model_config,
+                    total_queries,
+                    uses_batch_api(model_config, query_limit),
+                )
 
                 if not confirm_start():
                     continue
@@ -426,7 +570,13 @@ def main():
                             f"Progress: {selected_run['completed']}/{total_queries} queries"
                         )
 
-                        display_config_summary(model_config, total_queries)
+                        display_config_summary(
+                            model_config,
+                            total_queries,
+                            uses_batch_api(
+                                model_config, query_limit, checkpoint_manager
+                            ),
+                        )
 
                         resume_mode = True
                         logger.info("Resuming from checkpoint...")
@@ -457,7 +607,26 @@ def main():
     # ========== Phase 1: Prompt Generation ==========
     prompts_file = output_dir / "prompts.jsonl"
 
-    if not prompts_file.exists():
+    # Existing prompts are only reused if they were completely generated from
+    # the current dataset for the same number of queries; a partial file from
+    # an interrupted run or a changed dataset triggers regeneration
+    prompts_source = {
+        "data_digest": file_digest(data_file),
+        "num_queries": (
+            min(query_limit, total_available_queries)
+            if query_limit
+            else total_available_queries
+        ),
+    }
+    prompts_current = (
+        prompts_file.exists()
+        and checkpoint_manager.get_prompts_source() == prompts_source
+    )
+
+    if not prompts_current:
+        if prompts_file.exists():
+            logger.warning("⚠️  Prompts are incomplete or out of date, regenerating")
+
         display_phase_header(
             "Phase 1: Prompt Generation",
             "Creating prompts with database schemas and problematic SQL...",
@@ -473,7 +642,7 @@ def main():
                 limit=query_limit,
             )
             logger.info(f"✓ Generated {num_generated} prompts")
-            checkpoint_manager.save_checkpoint()
+            checkpoint_manager.set_prompts_source(prompts_source)
         except Exception as e:
             display_error(f"Prompt generation failed: {e}")
             logger.error(f"Prompt generation failed: {e}", exc_info=True)
@@ -492,24 +661,40 @@ def main():
     checkpoint_manager.set_phase("inference")
 
     try:
-        # Initialize LLM client
-        # Sequel2SQL uses its own agentic pipeline — no external API client needed
-        if model_config.get("no_api_key"):
-            api_client = Sequel2SQLClient(model_config)
-        else:
-            api_client = LLMClient(model_config)
+        if args.cache:
+            model_config["prompt_cache"] = True
 
-        # Initialize inference engine (sequential processing)
-        inference_engine = InferenceEngine(
-            api_client,
-            checkpoint_manager,
-            checkpoint_frequency=model_config["checkpoint_frequency"],
-        )
+        if uses_batch_api(model_config, query_limit, checkpoint_manager):
+            api_client = BatchInferenceEngine(model_config, checkpoint_manager)
+            num_processed = api_client.submit_and_wait(prompts_file, responses_file)
+        else:
+            # Initialize LLM client
+            # Sequel2SQL uses its own agentic pipeline — no external API client needed
+            if model_config.get("no_api_key"):
+                # Imported here: loading it builds the whole agent pipeline
+                from src.sequel2sql_client import Sequel2SQLClient
+
+                api_client = Sequel2SQLClient(model_config)
+            else:
+                # Imported here: pydantic-ai is only needed once a run starts
+                from src.api_client import LLMClient
+
+                api_client = LLMClient(model_config)
+
+            # Initialize inference engine (concurrent processing)
+            inference_engine = InferenceEngine(
+                api_client,
+                checkpoint_manager,
+                checkpoint_frequency=model_config["checkpoint_frequency"],
+                max_concurrency=model_config["max_concurrent_requests"],
+            )
 
-        # Run inference
-        num_processed = inference_engine.run_inference(
-            prompts_file, responses_file, resume=resume_mode
-        )
+            # Run inference
+            num_processed = asyncio.run(
+                inference_engine.arun_inference(
+                    prompts_file, responses_file, resume=resume_mode
+                )
+            )
 
         logger.info(f"✓ Processed {num_processed} queries")
 
@@ -564,7 +749,7 @@ def main():
         return 1
 
     # Start containers
-    if not start_docker_containers():
+    if not start_docker_containers(rebuild=args.rebuild):
         display_error("Failed to start Docker containers. Check logs for details.")
         return 1
 
@@ -1,13 +1,191 @@
 """LLM API client backed by pydantic-ai (Google Gemma 3 27B / Mistral Large)"""
 
+import asyncio
 import os
+import random
+import re
+import threading
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from pydantic_ai import Agent
 from pydantic_ai.models import Model
+from pydantic_ai.settings import ModelSettings
 
+from .config import get_outputs_dir
 from .logger_config import get_logger
+from .prompt_cache import PromptCache
+
+# Upper bound on any single retry wait, in seconds
+MAX_BACKOFF = 60
+
+# Server-directed retry delays as they appear in provider error messages:
+# "Retry-After: 7", Gemini's "retryDelay": "17s" / retry_delay { seconds: 17 }
+_RETRY_AFTER_RE = re.compile(
+    r"retry[-_ ]?after\W*(\d+(?:\.\d+)?)"
+    r"|retry_?delay\W*(?:seconds\W*)?(\d+(?:\.\d+)?)",
+    re.IGNORECASE,
+)
+
+
+# Error-message fallbacks for classify_error(), checked in order
+_ERROR_CLASSES = [
+    (re.compile(r"\b429\b|quota|rate.?limit|resource.?exhausted", re.I), "rate"),
+    (re.compile(r"\b5\d\d\b|server|overloaded|unavailable", re.I), "server"),
+]
+
+
+def classify_error(error: Exception) -> str:
+    """
+    Classify an API error as "rate", "server" or "other".
+
+    Uses the HTTP status code when the exception carries one (pydantic-ai's
+    ModelHTTPError does) and falls back to the precompiled message patterns.
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code == 429:
+        return "rate"
+    if isinstance(status_code, int) and status_code >= 500:
+        return "server"
+
+    message = str(error)
+    for pattern, kind in _ERROR_CLASSES:
+        if pattern.search(message):
+            return kind
+    return "other"
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Truncated exponential backoff with jitter for the given (1-based) attempt.
+
+    The jitter spreads retries from concurrent workers so they don't all hit
+    the API again at the same moment.
+    """
+    base = min(MAX_BACKOFF, 2**attempt)
+    return random.uniform(base / 2, base * 1.5)
+
+
+def parse_retry_after(error: Exception) -> Optional[float]:
+    """Extract a server-directed retry delay (seconds) from an error, if any."""
+    match = _RETRY_AFTER_RE.search(str(error))
+    if not match:
+        return None
+    return float(match.group(1) or match.group(2))
+
+
+class TokenBudget:
+    """
+    Client-side tokens-per-minute guard.
+
+    Callers record the tokens used by each response; wait() blocks until
+    the current one-minute window rolls over once usage is within 10% of
+    the limit.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.tokens_per_minute = tokens_per_minute
+        self.window_start = time.monotonic()
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def _roll(self) -> None:
+        """Start a new window if the current minute has elapsed."""
+        if time.monotonic() - self.window_start >= 60:
+            self.window_start = time.monotonic()
+            self.used = 0
+
+    def record(self, tokens: int) -> None:
+        """Add tokens used by a response to the current window."""
+        with self._lock:
+            self._roll()
+            self.used += tokens
+
+    def _delay(self) -> float:
+        """Seconds to wait before the next request (0 if within budget)."""
+        with self._lock:
+            self._roll()
+            if self.used < self.tokens_per_minute * 0.9:
+                return 0
+            delay = 60 - (time.monotonic() - self.window_start)
+
+        if delay > 0:
+            get_logger().warning(
+                f"⚠️  Token budget nearly spent. Waiting {delay:.0f}s for the next minute..."
+            )
+        return delay
+
+    def wait(self) -> None:
+        """Sleep until the minute rolls over if the budget is nearly spent."""
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def await_budget(self) -> None:
+        """Async wait(): yields to the event loop instead of blocking it."""
+        delay = self._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RateLimiter:
+    """
+    Client-side requests-per-second limit shared by concurrent callers.
+
+    Each request reserves the next free start slot (min_interval after the
+    previous one) and only sleeps until that slot, instead of pausing for
+    a fixed time after every call.
+    """
+
+    def __init__(self, requests_per_second: float):
+        self.min_interval = 1 / requests_per_second
+        self.next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserve the next start slot; returns the seconds until it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.min_interval
+        return slot - now
+
+    def wait(self) -> None:
+        """Sleep until this request's start slot."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def await_slot(self) -> None:
+        """Async wait(): yields to the event loop instead of blocking it."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def build_model_settings(model_config: Dict[str, Any]) -> ModelSettings:
+    """
+    Per-request bounds (timeout, output length) from the run config.
+
+    A max_output_tokens of None leaves the output length uncapped.
+    """
+    settings = ModelSettings(timeout=model_config.get("timeout", 60))
+    max_tokens = model_config.get("max_output_tokens", 1024)
+    if max_tokens:
+        settings["max_tokens"] = max_tokens
+    return settings
+
+
+def build_token_budget(model_config: Dict[str, Any]) -> Optional[TokenBudget]:
+    """Create a TokenBudget if the run config sets a tokens-per-minute cap."""
+    tokens_per_minute = model_config.get("tokens_per_minute")
+    return TokenBudget(tokens_per_minute) if tokens_per_minute else None
+
+
+def build_rate_limiter(model_config: Dict[str, Any]) -> Optional[RateLimiter]:
+    """Create a RateLimiter if the run config sets a requests-per-second cap."""
+    requests_per_second = model_config.get("requests_per_second")
+    return RateLimiter(requests_per_second) if requests_per_second else None
 
 
 class LLMClient:
@@ -36,27 +214,48 @@ class LLMClient:
         # Set API key env var expected by pydantic-ai provider
         self._configure_env()
 
-        # Create a simple text agent with no tools
-        self.agent: Agent[None, str] = Agent(self.model_id)
+        # Create a simple text agent with no tools; every request is bounded
+        # by a timeout and an output token cap so a hung call can't stall a run
+        self.agent: Agent[None, str] = Agent(
+            self.model_id, model_settings=build_model_settings(model_config)
+        )
+        self.max_retries = model_config.get("max_retries", 3)
+        self.token_budget = build_token_budget(model_config)
+        self.rate_limiter = build_rate_limiter(model_config)
+
+        # Responses are cached on disk so re-runs of the same prompts are free
+        self.prompt_cache = (
+            PromptCache(get_outputs_dir() / "prompt_cache")
+            if model_config.get("prompt_cache")
+            else None
+        )
 
-        # Statistics
+        # Statistics (cache hits are counted apart from API requests)
         self.total_requests = 0
         self.successful_requests = 0
         self.failed_requests = 0
+        self.cache_hits = 0
+        # Calls may run on several worker threads at once
+        self._stats_lock = threading.Lock()
+
+        # Event loop for synchronous call_api() calls (created on first use)
+        self._runner: Optional[asyncio.Runner] = None
+
+        # After a rate limit, no call is sent before this time.monotonic()
+        # deadline, so concurrent calls don't each spend a request to learn
+        # the API is still throttling
+        self._cooldown_until = 0.0
 
         self.logger.info(
             f"Initialized LLMClient: {model_config['display_name']} ({self.model_id})"
         )
 
     def _configure_env(self) -> None:
-        """Ensure the right env var is set for the pydantic-ai provider."""
-        from pathlib import Path
-
-        from dotenv import load_dotenv
-
-        root = Path(__file__).parent.parent.parent.parent
-        load_dotenv(root / ".env", override=False)
+        """
+        Ensure the right env var is set for the pydantic-ai provider.
 
+        The root .env file is already loaded once, when config is imported.
+        """
         if self.provider == "google":
             # pydantic-ai google provider reads GEMINI_API_KEY
             key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
@@ -69,13 +268,38 @@ class LLMClient:
             if key:
                 os.environ["MISTRAL_API_KEY"] = key
 
-    def call_api(self, prompt: str, max_retries: int = 3) -> str:
+    def call_api(
+        self, prompt: str, max_retries: Optional[int] = None, no_cache: bool = False
+    ) -> str:
+        """
+        Synchronous entry point for acall_api().
+
+        Every call runs on the same event loop: pydantic-ai's HTTP client is
+        bound to the loop it was first used on, so a fresh loop per call
+        (asyncio.run) would fail with "Event loop is closed" from the second
+        call on. Must not be called from a running event loop; await
+        acall_api() there.
+        """
+        if self._runner is None:
+            self._runner = asyncio.Runner()
+        return self._runner.run(self.acall_api(prompt, max_retries, no_cache))
+
+    async def acall_api(
+        self, prompt: str, max_retries: Optional[int] = None, no_cache: bool = False
+    ) -> str:
         """
         Call the LLM with automatic retry via pydantic-ai.
 
+        All waits (rate limits, retries, token budget) are awaited, so many
+        calls can be in flight on one event loop without worker threads.
+
+        Responses already in the prompt cache are returned without an API call.
+
         Args:
             prompt: The prompt to send to the model
             max_retries: Maximum number of retry attempts on transient errors
+                (defaults to the run config's max_retries)
+            no_cache: Bypass the prompt cache (neither read nor write it)
 
         Returns:
             The model response text
@@ -83,38 +307,73 @@ class LLMClient:
         Raises:
             RuntimeError: If all retries fail
         """
+        if max_retries is None:
+            max_retries = self.max_retries
+
+        cache = None if no_cache else self.prompt_cache
+        if cache is not None:
+            cache_key = PromptCache.make_key(
+                self.model_id, self.model_config.get("max_output_tokens", 1024), prompt
+            )
+            cached = cache.get(cache_key)
+            if cached is not None:
+                with self._stats_lock:
+                    self.cache_hits += 1
+                return cached
+
         last_error = None
 
         for attempt in range(1, max_retries + 1):
             try:
-                self.total_requests += 1
-                result = self.agent.run_sync(prompt)
-                self.successful_requests += 1
-                time.sleep(1)  # respect 1 req/sec rate limit
-                return str(result.output)
+                if self.token_budget:
+                    await self.token_budget.await_budget()
+                cooldown = self._cooldown_until - time.monotonic()
+                if cooldown > 0:
+                    await asyncio.sleep(cooldown)
+                if self.rate_limiter:
+                    await self.rate_limiter.await_slot()
+                with self._stats_lock:
+                    self.total_requests += 1
+                result = await self.agent.run(prompt)
+                with self._stats_lock:
+                    self.successful_requests += 1
+                if self.token_budget:
+                    self.token_budget.record(result.usage().total_tokens)
+                output = str(result.output)
+                if cache is not None:
+                    cache.put(cache_key, self.model_id, prompt, output)
+                return output
 
             except Exception as e:
                 last_error = e
                 self.logger.debug(
                     f"API call failed (attempt {attempt}/{max_retries}): {str(e)[:120]}"
                 )
-                error_str = str(e).lower()
+                error_kind = classify_error(e)
 
-                if "429" in error_str or "rate" in error_str or "quota" in error_str:
-                    wait = 15 * attempt
+                if error_kind == "rate":
+                    # Honor the server's retry delay when it gives one
+                    wait = min(
+                        parse_retry_after(e) or backoff_delay(attempt), MAX_BACKOFF
+                    )
+                    self._cooldown_until = max(
+                        self._cooldown_until, time.monotonic() + wait
+                    )
                     self.logger.warning(
-                        f"⚠️  Rate limit hit. Waiting {wait}s before retry {attempt}/{max_retries}..."
+                        f"⚠️  Rate limit hit. Waiting {wait:.1f}s before retry {attempt}/{max_retries}..."
                     )
-                    time.sleep(wait)
-                elif "500" in error_str or "503" in error_str or "server" in error_str:
+                    await asyncio.sleep(wait)
+                elif error_kind == "server":
+                    wait = backoff_delay(attempt)
                     self.logger.warning(
-                        f"⚠️  Server error. Waiting 5s before retry {attempt}/{max_retries}..."
+                        f"⚠️  Server error. Waiting {wait:.1f}s before retry {attempt}/{max_retries}..."
                     )
-                    time.sleep(5)
+                    await asyncio.sleep(wait)
                 elif attempt < max_retries:
-                    time.sleep(2)
+                    await asyncio.sleep(2)
 
-        self.failed_requests += 1
+        with self._stats_lock:
+            self.failed_requests += 1
         self.logger.error(
             f"❌ API call failed after {max_retries} attempts. Last error: {str(last_error)[:120]}"
         )
@@ -126,6 +385,7 @@ class LLMClient:
             "total_requests": self.total_requests,
             "successful_requests": self.successful_requests,
             "failed_requests": self.failed_requests,
+            "cache_hits": self.cache_hits,
             "success_rate": (
                 self.successful_requests / self.total_requests * 100
                 if self.total_requests > 0
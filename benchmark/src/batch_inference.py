@@ -0,0 +1,311 @@
+"""Batch inference engine using the provider-native Batch API (Mistral)"""
+
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from . import fast_json
+from .checkpoint_manager import CheckpointManager
+from .config import get_outputs_dir, load_api_key
+from .logger_config import get_logger
+from .prompt_cache import PromptCache
+from .prompt_generator import load_prompts
+
+# Batch job states that will not change any more
+TERMINAL_STATUSES = {"SUCCESS", "FAILED", "TIMEOUT_EXCEEDED", "CANCELLED"}
+
+# Poll interval bounds in seconds (doubles after every poll)
+MIN_POLL_INTERVAL = 10
+MAX_POLL_INTERVAL = 120
+
+
+class BatchInferenceEngine:
+    """
+    Inference engine that submits all prompts as a single batch job.
+
+    Features:
+    - One upload instead of one HTTP request per query (and batch pricing)
+    - Only queries not yet completed are submitted, so a re-run retries
+      the failed ones
+    - Responses in the prompt cache (when enabled) are used without
+      submitting them; new responses are added to it
+    - Polls the job with exponential backoff until it finishes
+    - Batch job id is stored in the checkpoint so a resumed run re-polls
+      the existing job instead of submitting a new one; it is cleared once
+      the results are downloaded
+    """
+
+    def __init__(
+        self,
+        model_config: Dict[str, Any],
+        checkpoint_manager: CheckpointManager,
+    ):
+        """
+        Initialize the batch inference engine.
+
+        Args:
+            model_config: Model configuration dictionary from config.get_model_config()
+            checkpoint_manager: CheckpointManager instance
+        """
+        from mistralai import Mistral
+
+        self.model_config = model_config
+        self.checkpoint_manager = checkpoint_manager
+        self.logger = get_logger()
+
+        # model_id is "<provider>:<model name>" for pydantic-ai
+        self.model_name = model_config["model_id"].split(":", 1)[1]
+        self.client = Mistral(api_key=load_api_key(model_config["provider"]))
+
+        # Same cache (and keys) as LLMClient, so either path can reuse the other's
+        self.prompt_cache = (
+            PromptCache(get_outputs_dir() / "prompt_cache")
+            if model_config.get("prompt_cache")
+            else None
+        )
+
+        # Statistics (mirrors LLMClient)
+        self.total_requests = 0
+        self.successful_requests = 0
+        self.failed_requests = 0
+        self.cache_hits = 0
+
+    def _cache_key(self, prompt: str) -> str:
+        """Prompt cache key for a prompt (matches LLMClient's)."""
+        return PromptCache.make_key(
+            self.model_config["model_id"],
+            self.model_config.get("max_output_tokens", 1024),
+            prompt,
+        )
+
+    def _write_batch_input(
+        self,
+        prompts_data: List[Dict[str, Any]],
+        indices: List[int],
+        batch_input_path: Path,
+    ) -> None:
+        """Serialize the given prompts as batch request lines keyed by query index."""
+        with open(batch_input_path, "w", encoding="utf-8") as f:
+            for i in indices:
+                request = {
+                    "custom_id": str(i),
+                    "body": {
+                        "max_tokens": self.model_config.get("max_output_tokens", 1024),
+                        "messages": [
+                            {"role": "user", "content": prompts_data[i]["prompt"]}
+                        ],
+                    },
+                }
+                f.write(fast_json.dumps_line(request))
+
+    def _submit(
+        self, prompts_data: List[Dict[str, Any]], indices: List[int], work_dir: Path
+    ) -> str:
+        """
+        Upload the batch input file and create a batch job.
+
+        Args:
+            prompts_data: All prompts in the run
+            indices: Query indices to include in the job
+            work_dir: Directory for the batch input file
+
+        Returns:
+            Batch job id
+        """
+        batch_input_path = work_dir / "batch_input.jsonl"
+        self._write_batch_input(prompts_data, indices, batch_input_path)
+
+        with open(batch_input_path, "rb") as f:
+            uploaded = self.client.files.upload(
+                file={"file_name": batch_input_path.name, "content": f},
+                purpose="batch",
+            )
+
+        job = self.client.batch.jobs.create(
+            input_files=[uploaded.id],
+            model=self.model_name,
+            endpoint="/v1/chat/completions",
+            metadata={"job_type": "sequel2sql_benchmark"},
+        )
+        self.logger.info(f"Submitted batch job {job.id} ({len(indices)} queries)")
+        return job.id
+
+    def _wait(self, job_id: str):
+        """Poll a batch job with exponential backoff until it is terminal."""
+        interval = MIN_POLL_INTERVAL
+
+        while True:
+            job = self.client.batch.jobs.get(job_id=job_id)
+            if job.status in TERMINAL_STATUSES:
+                return job
+
+            self.logger.info(
+                f"Batch job {job_id}: {job.status} "
+                f"({job.completed_requests or 0}/{job.total_requests or 0} done), "
+                f"next check in {interval}s"
+            )
+            time.sleep(interval)
+            interval = min(interval * 2, MAX_POLL_INTERVAL)
+
+    def _write_cached(
+        self,
+        prompts_data: List[Dict[str, Any]],
+        indices: List[int],
+        output_path: Path,
+    ) -> Tuple[List[int], int]:
+        """
+        Write responses found in the prompt cache to the responses file.
+
+        Returns:
+            The indices that still need a request, and the number written
+        """
+        missing = []
+        written = 0
+        with open(output_path, "a", encoding="utf-8") as f:
+            for index in indices:
+                data = prompts_data[index]
+                cached = self.prompt_cache.get(self._cache_key(data["prompt"]))
+                if cached is None:
+                    missing.append(index)
+                    continue
+
+                f.write(
+                    fast_json.dumps_line({**data, "response": cached, "_index": index})
+                )
+                written += 1
+                self.cache_hits += 1
+                self.checkpoint_manager.update_progress(index, failed=False)
+
+        if written:
+            self.logger.info(f"Using {written} cached responses")
+        return missing, written
+
+    def submit_and_wait(self, prompts_path: Path, output_path: Path) -> int:
+        """
+        Run inference for all remaining prompts through a single batch job.
+
+        Args:
+            prompts_path: Path to prompts JSONL file
+            output_path: Path to save responses (same schema as InferenceEngine)
+
+        Returns:
+            Number of queries processed
+        """
+        self.logger.info("Starting batch inference engine...")
+
+        prompts_data = load_prompts(prompts_path)
+        total_queries = len(prompts_data)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        processed = 0
+
+        job_id = self.checkpoint_manager.get_batch_job_id()
+        if job_id is None:
+            self.checkpoint_manager.set_total_queries(total_queries)
+
+            # Failed queries aren't completed, so they are submitted again
+            remaining = self.checkpoint_manager.get_remaining_queries(total_queries)
+            if not remaining:
+                self.logger.info("All queries already completed!")
+                return 0
+
+            if self.prompt_cache is not None:
+                remaining, processed = self._write_cached(
+                    prompts_data, remaining, output_path
+                )
+                if not remaining:
+                    self.checkpoint_manager.save()
+                    self.logger.info(f"✓ All {processed} responses served from cache")
+                    return processed
+
+            job_id = self._submit(prompts_data, remaining, output_path.parent)
+            self.checkpoint_manager.set_batch_job_id(job_id)
+        else:
+            self.logger.info(f"Re-polling existing batch job {job_id}")
+
+        job = self._wait(job_id)
+
+        if not job.output_file:
+            # Nothing to download; forget the job so the next run resubmits
+            self.checkpoint_manager.set_batch_job_id(None)
+            raise RuntimeError(f"Batch job {job_id} ended with status {job.status}")
+
+        if job.status != "SUCCESS":
+            self.logger.warning(
+                f"Batch job {job_id} ended with status {job.status}; "
+                "keeping partial results"
+            )
+
+        output = self.client.files.download(file_id=job.output_file)
+
+        # Reshape batch output lines into the responses.jsonl schema
+        completed = self.checkpoint_manager.get_completed_indices()
+
+        with open(output_path, "a", encoding="utf-8") as f:
+            for line in output.iter_lines():
+                if not line.strip():
+                    continue
+
+                entry = fast_json.loads(line)
+                index = int(entry["custom_id"])
+                if index in completed:
+                    continue
+
+                self.total_requests += 1
+                response = entry.get("response") or {}
+
+                if response.get("status_code") == 200:
+                    content = response["body"]["choices"][0]["message"]["content"]
+                    result = {
+                        **prompts_data[index],
+                        "response": content,
+                        "_index": index,
+                    }
+                    f.write(fast_json.dumps_line(result))
+
+                    if self.prompt_cache is not None:
+                        prompt = prompts_data[index]["prompt"]
+                        self.prompt_cache.put(
+                            self._cache_key(prompt),
+                            self.model_config["model_id"],
+                            prompt,
+                            content,
+                        )
+
+                    self.successful_requests += 1
+                    processed += 1
+                    self.checkpoint_manager.update_progress(
+                        index, failed=False, api_stats=self.get_statistics()
+                    )
+                else:
+                    self.failed_requests += 1
+                    self.logger.error(
+                        f"Failed query {index}: {str(entry.get('error'))[:100]}"
+                    )
+                    self.checkpoint_manager.update_progress(
+                        index, failed=True, api_stats=self.get_statistics()
+                    )
+
+        # The results are saved; the next run submits whatever is still missing
+        self.checkpoint_manager.set_batch_job_id(None)
+
+        self.logger.info("✓ Batch inference complete!")
+        self.logger.info(f"  Processed: {processed} queries")
+        self.logger.info(
+            f"  Failed: {self.checkpoint_manager.get_failed_count()} queries"
+        )
+
+        return processed
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get usage statistics (same schema as LLMClient)."""
+        return {
+            "total_requests": self.total_requests,
+            "successful_requests": self.successful_requests,
+            "failed_requests": self.failed_requests,
+            "cache_hits": self.cache_hits,
+            "success_rate": (
+                self.successful_requests / self.total_requests * 100
+                if self.total_requests > 0
+                else 0.0
+            ),
+        }
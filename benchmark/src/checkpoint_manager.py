@@ -1,10 +1,13 @@
 """Checkpoint manager for saving and resuming benchmark progress"""
 
-import json
+import atexit
+import os
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+from . import fast_json
 from .logger_config import get_logger
 
 
@@ -13,25 +16,50 @@ class CheckpointManager:
     Manages benchmark checkpoints for resume capability.
 
     Saves progress every N queries to allow resuming interrupted runs.
+    Per-query progress updates are written behind: the file is rewritten
+    every flush_every updates or flush_secs seconds, on explicit saves, and
+    at interpreter exit if anything is still pending.
+
+    Saves run on the caller's thread: an atomic rewrite of a full run's
+    checkpoint takes well under a millisecond, so a background writer would
+    only add locking and shutdown ordering.
     """
 
-    def __init__(self, output_dir: Path):
+    def __init__(
+        self, output_dir: Path, flush_every: int = 10, flush_secs: float = 5.0
+    ):
         """
         Initialize the checkpoint manager.
 
         Args:
             output_dir: Directory where checkpoint will be saved
+            flush_every: Save after this many unsaved progress updates
+            flush_secs: Save on the next update once this many seconds have
+                passed since the last save
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.checkpoint_file = self.output_dir / "checkpoint.json"
         self.logger = get_logger()
 
+        # (mtime, size) of checkpoint.json when it last matched checkpoint_data
+        # (read or written here), so load_checkpoint() can skip an unchanged
+        # file. The size guards against coarse filesystem timestamps
+        self._loaded_stamp = None
+
+        self.flush_every = flush_every
+        self.flush_secs = flush_secs
+        self._dirty_count = 0
+        self._last_flush = time.monotonic()
+        atexit.register(self._flush_pending)
+
         # Try to load existing checkpoint, otherwise initialize with defaults
         if self.checkpoint_file.exists():
             try:
-                with open(self.checkpoint_file, "r", encoding="utf-8") as f:
-                    self.checkpoint_data = json.load(f)
+                self._loaded_stamp = self._file_stamp()
+                self.checkpoint_data = fast_json.loads(
+                    self.checkpoint_file.read_bytes()
+                )
                 self.logger.info(
                     f"Loaded existing checkpoint: {self.checkpoint_data['completed_queries']}/{self.checkpoint_data['total_queries']} queries completed"
                 )
@@ -43,6 +71,19 @@ class CheckpointManager:
         else:
             self._initialize_checkpoint_data()
 
+        self._load_index_sets()
+
+    def _load_index_sets(self) -> None:
+        """
+        Mirror the completed/failed index lists into sets.
+
+        The sets are the source of truth while running (O(1) membership);
+        they are written back to the lists as sorted lists on save.
+        """
+        self._completed = set(self.checkpoint_data["completed_indices"])
+        self._failed = set(self.checkpoint_data["failed_indices"])
+        self._start_monotonic = None
+
     def _initialize_checkpoint_data(self) -> None:
         """Initialize checkpoint data with default values."""
         self.checkpoint_data = {
@@ -72,10 +113,18 @@ class CheckpointManager:
         """Check if a checkpoint file exists."""
         return self.checkpoint_file.exists()
 
+    def _file_stamp(self) -> Tuple[int, int]:
+        """Return the checkpoint file's (mtime in ns, size)."""
+        stat = self.checkpoint_file.stat()
+        return stat.st_mtime_ns, stat.st_size
+
     def load_checkpoint(self) -> Optional[Dict[str, Any]]:
         """
         Load checkpoint from file.
 
+        The file is only re-parsed if something else changed it since it was
+        last read or written here; otherwise the in-memory data is returned.
+
         Returns:
             Checkpoint data dictionary or None if not found
         """
@@ -83,13 +132,18 @@ class CheckpointManager:
             return None
 
         try:
-            with open(self.checkpoint_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.checkpoint_data = data
-                self.logger.info(
-                    f"Loaded checkpoint: {data['completed_queries']}/{data['total_queries']} queries completed"
-                )
-                return data
+            stamp = self._file_stamp()
+            if stamp == self._loaded_stamp:
+                return self.checkpoint_data
+
+            data = fast_json.loads(self.checkpoint_file.read_bytes())
+            self._loaded_stamp = stamp
+            self.checkpoint_data = data
+            self._load_index_sets()
+            self.logger.info(
+                f"Loaded checkpoint: {data['completed_queries']}/{data['total_queries']} queries completed"
+            )
+            return data
         except Exception as e:
             self.logger.error(f"Failed to load checkpoint: {e}")
             return None
@@ -105,10 +159,21 @@ class CheckpointManager:
             self.checkpoint_data.update(updates)
 
         self.checkpoint_data["last_updated"] = datetime.now().isoformat()
+        self.checkpoint_data["completed_indices"] = sorted(self._completed)
+        self.checkpoint_data["failed_indices"] = sorted(self._failed)
+
+        self._dirty_count = 0
+        self._last_flush = time.monotonic()
 
         try:
-            with open(self.checkpoint_file, "w", encoding="utf-8") as f:
-                json.dump(self.checkpoint_data, f, indent=2, ensure_ascii=False)
+            # Write a sibling file and swap it in, so a crash mid-write never
+            # leaves a truncated checkpoint behind
+            tmp_file = self.checkpoint_file.with_suffix(".json.tmp")
+            tmp_file.write_text(
+                fast_json.dumps(self.checkpoint_data, indent=True), encoding="utf-8"
+            )
+            os.replace(tmp_file, self.checkpoint_file)
+            self._loaded_stamp = self._file_stamp()
 
             self.logger.debug(
                 f"Checkpoint saved: {self.checkpoint_data['completed_queries']}/{self.checkpoint_data['total_queries']} queries"
@@ -131,15 +196,13 @@ class CheckpointManager:
             api_stats: Optional API client statistics
         """
         if failed:
-            if completed_index not in self.checkpoint_data["failed_indices"]:
-                self.checkpoint_data["failed_indices"].append(completed_index)
+            if completed_index not in self._failed:
+                self._failed.add(completed_index)
                 self.checkpoint_data["failed_queries"] += 1
         else:
-            if completed_index not in self.checkpoint_data["completed_indices"]:
-                self.checkpoint_data["completed_indices"].append(completed_index)
-                self.checkpoint_data["completed_queries"] = len(
-                    self.checkpoint_data["completed_indices"]
-                )
+            if completed_index not in self._completed:
+                self._completed.add(completed_index)
+                self.checkpoint_data["completed_queries"] = len(self._completed)
 
         # Update API statistics if provided
         if api_stats:
@@ -155,19 +218,41 @@ class CheckpointManager:
 
             # Calculate average query time
             if self.checkpoint_data["completed_queries"] > 0:
-                start_time = self.checkpoint_data["statistics"].get(
-                    "inference_start_time"
-                )
-                if start_time:
-                    elapsed = (
-                        datetime.now() - datetime.fromisoformat(start_time)
-                    ).total_seconds()
+                start_monotonic = self._get_start_monotonic()
+                if start_monotonic is not None:
+                    elapsed = time.monotonic() - start_monotonic
                     self.checkpoint_data["statistics"]["average_query_time"] = (
                         elapsed / self.checkpoint_data["completed_queries"]
                     )
 
-        # Save checkpoint
-        self.save_checkpoint()
+        # Write behind: save once enough updates (or time) have accumulated
+        self._dirty_count += 1
+        if (
+            self._dirty_count >= self.flush_every
+            or time.monotonic() - self._last_flush >= self.flush_secs
+        ):
+            self.save_checkpoint()
+
+    def _get_start_monotonic(self) -> Optional[float]:
+        """
+        Inference start time on the time.monotonic() clock.
+
+        The ISO timestamp in the checkpoint is parsed once and converted to a
+        monotonic offset, instead of on every progress update.
+        """
+        if self._start_monotonic is None:
+            start_time = self.checkpoint_data["statistics"].get("inference_start_time")
+            if start_time:
+                elapsed = (
+                    datetime.now() - datetime.fromisoformat(start_time)
+                ).total_seconds()
+                self._start_monotonic = time.monotonic() - elapsed
+        return self._start_monotonic
+
+    def _flush_pending(self) -> None:
+        """Save progress updates that have not been written yet (atexit hook)."""
+        if self._dirty_count:
+            self.save_checkpoint()
 
     def get_remaining_queries(self, total_queries: int) -> List[int]:
         """
@@ -179,16 +264,15 @@ class CheckpointManager:
         Returns:
             List of remaining query indices
         """
-        completed = set(self.checkpoint_data["completed_indices"])
-        return [i for i in range(total_queries) if i not in completed]
+        return [i for i in range(total_queries) if i not in self._completed]
 
     def get_completed_indices(self) -> Set[int]:
-        """Get set of completed query indices."""
-        return set(self.checkpoint_data["completed_indices"])
+        """Get set of completed query indices (a copy; safe to mutate)."""
+        return set(self._completed)
 
     def get_failed_indices(self) -> Set[int]:
-        """Get set of failed query indices."""
-        return set(self.checkpoint_data["failed_indices"])
+        """Get set of failed query indices (a copy; safe to mutate)."""
+        return set(self._failed)
 
     def get_failed_count(self) -> int:
         """Get count of failed queries."""
@@ -230,6 +314,24 @@ class CheckpointManager:
         """Check if evaluation is completed."""
         return self.checkpoint_data.get("evaluation_completed", False)
 
+    def set_batch_job_id(self, job_id: Optional[str]) -> None:
+        """Record the provider batch job id (None clears it)."""
+        self.checkpoint_data["batch_job_id"] = job_id
+        self.save_checkpoint()
+
+    def get_batch_job_id(self) -> Optional[str]:
+        """Get the provider batch job id for this run, if one was submitted."""
+        return self.checkpoint_data.get("batch_job_id")
+
+    def set_prompts_source(self, source: Dict[str, Any]) -> None:
+        """Record what the prompts file was generated from (saved immediately)."""
+        self.checkpoint_data["prompts_source"] = source
+        self.save_checkpoint()
+
+    def get_prompts_source(self) -> Optional[Dict[str, Any]]:
+        """Get what the prompts file was generated from, if it was completed."""
+        return self.checkpoint_data.get("prompts_source")
+
     def set_total_queries(self, total: int, save: bool = True) -> None:
         """Set the total number of queries.
 
@@ -251,6 +353,12 @@ class CheckpointManager:
 
     def clear(self) -> None:
         """Clear checkpoint (for restart)."""
+        # Start over in memory too, so a later save doesn't write the cleared
+        # run's progress back; nothing is left for the exit hook to flush
+        self._initialize_checkpoint_data()
+        self._load_index_sets()
+        self._dirty_count = 0
+        self._loaded_stamp = None
         if self.checkpoint_file.exists():
             self.checkpoint_file.unlink()
             self.logger.info("Checkpoint cleared")
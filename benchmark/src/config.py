@@ -2,6 +2,7 @@
 
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -21,29 +22,63 @@ PROVIDERS = {
     "mistral": {
         "model_id": "mistral:mistral-large-latest",
         "display_name": "Mistral Large Latest",
+        # Complete runs go through the Mistral Batch API
+        "supports_batch": True,
     },
     "sequel2sql": {
         "model_id": "sequel2sql:pipeline",
         "display_name": "Sequel2SQL Pipeline",
         # No API key needed — uses DEFAULT_MODEL from sqlagent.py
         "no_api_key": True,
+        # The pipeline shares per-database engines between queries and isn't
+        # safe to run from several threads at once
+        "max_concurrent_requests": 1,
+        # The settings apply to every model request the agent makes, tool
+        # calls included, so output isn't capped (a cut-off tool call fails
+        # the step); the timeout still bounds each request
+        "max_output_tokens": None,
     },
 }
 
 DEFAULT_PROVIDER = "mistral"
 
+# Environment variable holding each provider's API key
+API_KEY_ENV_VARS = {
+    "google": "GOOGLE_API_KEY",
+    "mistral": "MISTRAL_API_KEY",
+}
+
+# Placeholder prefix used by .env.example ("your_..._here")
+PLACEHOLDER_KEY_PREFIX = "your_"
+
 # General run configuration
 RUN_CONFIG = {
-    "timeout": 10,  # seconds
+    "timeout": 60,  # seconds, per LLM request (room for a full-length response)
+    "max_retries": 3,  # attempts per query on transient errors
+    "max_output_tokens": 1024,  # cap on generated tokens per response
+    "tokens_per_minute": None,  # optional TPM cap enforced client-side
+    "requests_per_second": 1,  # spacing between LLM request starts
     "max_threads": 8,
+    "max_concurrent_requests": 4,  # In-flight LLM calls during inference
     "checkpoint_frequency": 10,  # Save checkpoint every N queries
+    # Reuse responses cached under outputs/prompt_cache (opt-in with --cache;
+    # off by default so every run measures live model calls)
+    "prompt_cache": False,
 }
 
 
+def _is_valid_key(key: Optional[str]) -> bool:
+    """True if an API key is set and isn't a .env.example placeholder."""
+    return bool(key) and not key.startswith(PLACEHOLDER_KEY_PREFIX)
+
+
+@lru_cache(maxsize=None)
 def load_api_key(provider: str) -> str:
     """
     Load a single API key for the given provider from environment variables.
 
+    Successful lookups are cached; a missing key still exits every time.
+
     Args:
         provider: "google", "mistral", or "sequel2sql"
 
@@ -63,19 +98,14 @@ def load_api_key(provider: str) -> str:
         print(f"   cp {ROOT_DIR}/.env.example {ROOT_DIR}/.env")
         sys.exit(1)
 
-    env_var_map = {
-        "google": "GOOGLE_API_KEY",
-        "mistral": "MISTRAL_API_KEY",
-    }
-
-    env_var = env_var_map.get(provider)
+    env_var = API_KEY_ENV_VARS.get(provider)
     if not env_var:
         print(f"\n❌ Error: Unknown provider '{provider}'")
         print(f"   Supported providers: {', '.join(PROVIDERS.keys())}")
         sys.exit(1)
 
     key = os.getenv(env_var)
-    if not key or key.startswith("your_"):
+    if not _is_valid_key(key):
         print(f"\n❌ Error: Missing or invalid API key in .env: {env_var}")
         if provider == "google":
             print(f"   Get your key from: https://aistudio.google.com/apikey")
@@ -106,13 +136,13 @@ def load_api_keys() -> List[str]:
     # Try numbered rotation keys first (legacy)
     for i in range(1, 9):
         key = os.getenv(f"GEMINI_API_KEY_{i}")
-        if key and not key.startswith("your_"):
+        if _is_valid_key(key):
             api_keys.append(key)
 
     # Fall back to single GOOGLE_API_KEY
     if not api_keys:
         key = os.getenv("GOOGLE_API_KEY")
-        if key and not key.startswith("your_"):
+        if _is_valid_key(key):
             api_keys.append(key)
 
     if not api_keys:
@@ -150,13 +180,43 @@ def get_model_config(provider: Optional[str] = None) -> Dict[str, Any]:
         "model_id": provider_entry["model_id"],
         "display_name": provider_entry["display_name"],
     }
-    # Forward any extra provider-level flags (e.g. no_api_key for sequel2sql)
+    # Forward any extra provider-level flags (e.g. no_api_key for sequel2sql);
+    # they take precedence over the general run configuration
     for key, value in provider_entry.items():
         if key not in ("model_id", "display_name"):
-            config.setdefault(key, value)
+            config[key] = value
     return config
 
 
+@lru_cache(maxsize=None)
+def _validate_data_paths() -> None:
+    """
+    Check that the benchmark dataset and table dumps are present.
+
+    Runs once per process (the paths don't change during a run); both
+    entries are checked with a single directory listing.
+
+    Raises:
+        SystemExit: If the data directory or a required entry is missing
+    """
+    data_dir = get_data_dir()
+
+    try:
+        with os.scandir(data_dir) as it:
+            entries = {entry.name for entry in it}
+    except FileNotFoundError:
+        print(f"\n❌ Error: Data directory not found: {data_dir}")
+        sys.exit(1)
+
+    if "postgresql_full.jsonl" not in entries:
+        postgresql_data = data_dir / "postgresql_full.jsonl"
+        print(f"\n❌ Error: PostgreSQL dataset not found: {postgresql_data}")
+        sys.exit(1)
+
+    if "postgre_table_dumps" not in entries:
+        sys.exit(1)
+
+
 def validate_config(provider: Optional[str] = None) -> bool:
     """
     Validate the complete configuration.
@@ -174,40 +234,30 @@ def validate_config(provider: Optional[str] = None) -> bool:
     load_api_key(provider)
 
     # Validate paths
-    benchmark_dir = Path(__file__).parent.parent
-    data_dir = benchmark_dir / "data"
-
-    if not data_dir.exists():
-        print(f"\n❌ Error: Data directory not found: {data_dir}")
-        sys.exit(1)
-
-    postgresql_data = data_dir / "postgresql_full.jsonl"
-    if not postgresql_data.exists():
-        print(f"\n❌ Error: PostgreSQL dataset not found: {postgresql_data}")
-        sys.exit(1)
-
-    postgre_dumps = data_dir / "postgre_table_dumps"
-    if not postgre_dumps.exists():
-        sys.exit(1)
+    _validate_data_paths()
 
     return True
 
 
+@lru_cache(maxsize=None)
 def get_benchmark_dir() -> Path:
-    """Get the benchmark root directory."""
+    """Get the benchmark root directory (computed once; Paths are immutable)."""
     return Path(__file__).parent.parent
 
 
+@lru_cache(maxsize=None)
 def get_data_dir() -> Path:
     """Get the data directory."""
     return get_benchmark_dir() / "data"
 
 
+@lru_cache(maxsize=None)
 def get_outputs_dir() -> Path:
     """Get the outputs directory."""
     return get_benchmark_dir() / "outputs"
 
 
+@lru_cache(maxsize=None)
 def get_logs_dir() -> Path:
     """Get the logs directory."""
     return get_benchmark_dir() / "logs"
@@ -0,0 +1,48 @@
+"""JSON (de)serialization helpers, backed by orjson when it is installed"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document (e.g. one JSONL line).
+
+    Args:
+        data: JSON text as str or bytes
+
+    Returns:
+        Parsed Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize an object to compact UTF-8 JSON text (non-ASCII kept as-is).
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps_line(obj: Any) -> str:
+    """Serialize an object as a single JSONL line (including the newline)."""
+    return dumps(obj) + "\n"
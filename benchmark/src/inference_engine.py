@@ -1,9 +1,9 @@
-"""Inference engine for sequential LLM calls with progress tracking"""
+"""Inference engine for concurrent LLM calls with progress tracking"""
 
-import json
+import asyncio
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Set
+from typing import TYPE_CHECKING, Any, Dict, List, Set
 
 from rich.console import Console
 from rich.progress import (
@@ -17,19 +17,22 @@ from rich.progress import (
     TimeRemainingColumn,
 )
 
-from .api_client import LLMClient
+from . import fast_json
 from .checkpoint_manager import CheckpointManager
 from .logger_config import get_logger
 from .prompt_generator import load_prompts
-from .sequel2sql_client import Sequel2SQLClient
+
+if TYPE_CHECKING:
+    # Annotation only; importing it at runtime would load pydantic-ai
+    from .api_client import LLMClient
 
 
 class InferenceEngine:
     """
-    Sequential inference engine with checkpoint support.
+    Concurrent inference engine with checkpoint support.
 
     Features:
-    - Sequential execution (one query at a time)
+    - Concurrent execution bounded by an asyncio.Semaphore
     - Progress bar with real-time statistics
     - Checkpoint saving every N queries
     - Resume from checkpoint capability
@@ -37,9 +40,10 @@ class InferenceEngine:
 
     def __init__(
         self,
-        api_client: LLMClient,
+        api_client: "LLMClient",
         checkpoint_manager: CheckpointManager,
         checkpoint_frequency: int = 10,
+        max_concurrency: int = 1,
     ):
         """
         Initialize the inference engine.
@@ -48,10 +52,12 @@ class InferenceEngine:
             api_client: Configured LLMClient instance
             checkpoint_manager: CheckpointManager instance
             checkpoint_frequency: Save checkpoint every N queries
+            max_concurrency: Maximum number of in-flight API calls
         """
         self.api_client = api_client
         self.checkpoint_manager = checkpoint_manager
         self.checkpoint_frequency = checkpoint_frequency
+        self.max_concurrency = max(1, max_concurrency)
 
         self.logger = get_logger()
         self.console = Console()
@@ -60,7 +66,7 @@ class InferenceEngine:
         self.start_time = None
         self.queries_completed = 0
 
-    def _worker(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _worker(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Worker function to process a single query.
 
@@ -76,11 +82,15 @@ class InferenceEngine:
 
         try:
             # Sequel2SQL pipeline client takes full task data (db_id + query)
-            # rather than a pre-built prompt string
-            if isinstance(self.api_client, Sequel2SQLClient):
-                response = self.api_client.call_api_with_data(data)
+            # rather than a pre-built prompt string; it blocks, so it runs in
+            # a worker thread. Checked by method rather than isinstance() so
+            # this module doesn't import (and build) the agent pipeline
+            if hasattr(self.api_client, "call_api_with_data"):
+                response = await asyncio.to_thread(
+                    self.api_client.call_api_with_data, data
+                )
             else:
-                response = self.api_client.call_api(prompt)
+                response = await self.api_client.acall_api(prompt)
 
             # Create result
             result = {**data, "response": response, "_index": index}
@@ -97,7 +107,27 @@ class InferenceEngine:
         self, prompts_path: Path, output_path: Path, resume: bool = False
     ) -> int:
         """
-        Run inference on all prompts with multi-threading and progress tracking.
+        Synchronous entry point for arun_inference().
+
+        Args:
+            prompts_path: Path to prompts JSONL file
+            output_path: Path to save responses
+            resume: Whether to resume from checkpoint
+
+        Returns:
+            Number of queries processed
+        """
+        return asyncio.run(self.arun_inference(prompts_path, output_path, resume))
+
+    async def arun_inference(
+        self, prompts_path: Path, output_path: Path, resume: bool = False
+    ) -> int:
+        """
+        Run inference on all prompts concurrently with progress tracking.
+
+        Up to max_concurrency API calls are in flight at once; results are
+        appended to the output file in completion order (each carries its
+        "_index").
 
         Args:
             prompts_path: Path to prompts JSONL file
@@ -108,7 +138,6 @@ class InferenceEngine:
             Number of queries processed
         """
         self.logger.info("Starting inference engine...")
-        self.start_time = time.time()
 
         # Load prompts
         prompts_data = load_prompts(prompts_path)
@@ -119,13 +148,14 @@ class InferenceEngine:
 
         # Determine which queries to process
         if resume:
-            completed_indices = self.checkpoint_manager.get_completed_indices()
-            remaining_indices = [
-                i for i in range(total_queries) if i not in completed_indices
-            ]
+            # Checked against the manager's own completed set (no copy)
+            remaining_indices = self.checkpoint_manager.get_remaining_queries(
+                total_queries
+            )
+            num_completed = total_queries - len(remaining_indices)
 
             self.logger.info(
-                f"Resuming: {len(completed_indices)} completed, {len(remaining_indices)} remaining"
+                f"Resuming: {num_completed} completed, {len(remaining_indices)} remaining"
             )
         else:
             remaining_indices = list(range(total_queries))
@@ -138,88 +168,121 @@ class InferenceEngine:
         # Prepare tasks
         tasks = [{"data": prompts_data[i], "index": i} for i in remaining_indices]
 
+        # Run sequentially, queries on the same database go back to back so
+        # per-database state (the pipeline's cached deps) is reused. Concurrent
+        # runs keep input order, so in-flight calls spread over databases
+        if self.max_concurrency == 1:
+            tasks.sort(key=lambda task: task["data"].get("db_id", ""))
+
         # Create output directory
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         # Run inference with progress bar
-        self.logger.info(f"Processing {len(tasks)} queries sequentially...")
-
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[bold blue]{task.description}"),
-            BarColumn(complete_style="green", finished_style="bold green"),
-            TaskProgressColumn(),
-            MofNCompleteColumn(),
-            TextColumn("│"),
-            TimeElapsedColumn(),
-            TextColumn("│"),
-            TimeRemainingColumn(),
-            console=self.console,
-            expand=True,
-        ) as progress:
-            task_id = progress.add_task("Generating SQL Solutions", total=len(tasks))
+        self.logger.info(
+            f"Processing {len(tasks)} queries ({self.max_concurrency} concurrent)..."
+        )
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
 
-            # Process tasks sequentially
-            for task in tasks:
-                index = task["index"]
+        # Throughput is timed over the API calls only (not prompt loading);
+        # perf_counter is monotonic, unlike the wall clock
+        self.start_time = time.perf_counter()
 
+        async def run_task(task: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
                 try:
-                    result = self._worker(task)
-
-                    if result["success"]:
-                        # Write result immediately to file
-                        with open(output_path, "a", encoding="utf-8") as f:
-                            json.dump(result["result"], f, ensure_ascii=False)
-                            f.write("\n")
-
-                        self.queries_completed += 1
-
-                        # Update checkpoint for each successful query
-                        self.checkpoint_manager.update_progress(
-                            index,
-                            failed=False,
-                            api_stats=self.api_client.get_statistics(),
-                        )
-
-                        # Save checkpoint every N queries
-                        if self.queries_completed % self.checkpoint_frequency == 0:
-                            self.checkpoint_manager.save()
-
-                    else:
-                        # Mark as failed
-                        self.checkpoint_manager.update_progress(
-                            index,
-                            failed=True,
-                            api_stats=self.api_client.get_statistics(),
-                        )
+                    return await self._worker(task)
+                except Exception as e:
+                    self.logger.error(
+                        f"Unexpected error processing query {task['index']}: {e}"
+                    )
+                    return {"success": False, "index": task["index"], "error": str(e)}
+
+        # The responses file stays open for the whole run
+        with (
+            open(output_path, "a", encoding="utf-8") as out_f,
+            Progress(
+                SpinnerColumn(),
+                TextColumn("[bold blue]{task.description}"),
+                BarColumn(complete_style="green", finished_style="bold green"),
+                TaskProgressColumn(),
+                MofNCompleteColumn(),
+                TextColumn("│"),
+                TimeElapsedColumn(),
+                TextColumn("│"),
+                TimeRemainingColumn(),
+                console=self.console,
+                expand=True,
+            ) as progress,
+        ):
+            task_id = progress.add_task("Generating SQL Solutions", total=len(tasks))
+            model_name = self.api_client.model_config.get("display_name", "LLM")
+            # model_name is a format argument, not part of the template, so
+            # braces in a display name can't break .format()
+            desc_tmpl = (
+                "Generating SQL Solutions [{model_name}] "
+                "[green]\u2713{passed}[/green] [red]\u2717{failed}[/red]"
+            )
+
+            # Results are handled on the event loop as they complete, so
+            # checkpoint and file updates never race with each other
+            for next_result in asyncio.as_completed([run_task(task) for task in tasks]):
+                result = await next_result
+                index = result["index"]
+                api_stats = self.api_client.get_statistics()
+
+                if result["success"]:
+                    # Write result immediately; flushed before the checkpoint
+                    # records it, so a crash can't mark a lost line done
+                    out_f.write(fast_json.dumps_line(result["result"]))
+                    out_f.flush()
+
+                    self.queries_completed += 1
+
+                    # Update checkpoint for each successful query
+                    self.checkpoint_manager.update_progress(
+                        index,
+                        failed=False,
+                        api_stats=api_stats,
+                    )
+
+                    # Save checkpoint every N queries
+                    if self.queries_completed % self.checkpoint_frequency == 0:
                         self.checkpoint_manager.save()
 
-                except Exception as e:
-                    self.logger.error(f"Unexpected error processing query {index}: {e}")
+                else:
+                    # Mark as failed
                     self.checkpoint_manager.update_progress(
                         index,
                         failed=True,
-                        api_stats=self.api_client.get_statistics(),
+                        api_stats=api_stats,
                     )
-                    self.checkpoint_manager.save()
 
-                # Update progress bar
-                progress.update(task_id, advance=1)
+                    # Failures are batched like successes (pending updates
+                    # are still saved at exit)
+                    attempted = (
+                        self.queries_completed
+                        + self.checkpoint_manager.get_failed_count()
+                    )
+                    if attempted % self.checkpoint_frequency == 0:
+                        self.checkpoint_manager.save()
 
-                # Update description with current stats
-                passed = self.queries_completed
-                failed = self.checkpoint_manager.get_failed_count()
-                model_name = self.api_client.model_config.get("display_name", "LLM")
+                # Advance the bar and refresh the pass/fail counts in one update
                 progress.update(
                     task_id,
-                    description=f"Generating SQL Solutions [{model_name}] [green]\u2713{passed}[/green] [red]\u2717{failed}[/red]",
+                    advance=1,
+                    description=desc_tmpl.format(
+                        model_name=model_name,
+                        passed=self.queries_completed,
+                        failed=self.checkpoint_manager.get_failed_count(),
+                    ),
                 )
 
         # Final checkpoint save
         self.checkpoint_manager.save()
 
         # Log statistics
-        elapsed = time.time() - self.start_time
+        elapsed = time.perf_counter() - self.start_time
         queries_per_min = (self.queries_completed / elapsed) * 60 if elapsed > 0 else 0
 
         self.logger.info(f"✓ Inference complete!")
@@ -234,6 +297,8 @@ class InferenceEngine:
         self.logger.info(
             f"  API calls: {stats['total_requests']} (success rate: {stats['success_rate']:.1f}%)"
         )
+        if stats.get("cache_hits"):
+            self.logger.info(f"  Cached responses: {stats['cache_hits']}")
 
         return self.queries_completed
 
@@ -242,6 +307,7 @@ if __name__ == "__main__":
     # Test inference engine
     from datetime import datetime
 
+    from .api_client import LLMClient
     from .config import (
         DEFAULT_PROVIDER,
         get_data_dir,
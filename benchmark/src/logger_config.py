@@ -5,28 +5,51 @@ import sys
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
+from typing import Optional
 
 from rich.console import Console
 from rich.logging import RichHandler
 
 from .config import get_logs_dir
 
+# Formatters are stateless, so every setup_logger() call shares them
+CONSOLE_FORMAT = logging.Formatter("%(message)s", datefmt="[%X]")
+FILE_FORMAT = logging.Formatter(
+    "%(asctime)s | %(levelname)-8s | %(name)s:%(lineno)d | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+# Log file the logger is currently writing to (None until setup_logger())
+_log_file: Optional[Path] = None
+
 
 def setup_logger(run_timestamp: str) -> logging.Logger:
     """
     Setup dual logging: console (rich) + rotating file.
 
+    Calling it again for the log file already in use is a no-op; a new
+    timestamp (e.g. the next interactive run) switches to a new file.
+
     Args:
         run_timestamp: Timestamp string for the log filename (e.g., "2026-02-02_14-30-45")
 
     Returns:
         Configured logger instance
     """
+    global _log_file
+
     # Create logger
     logger = logging.getLogger("sequel2sql")
+    logs_dir = get_logs_dir()
+    log_file = logs_dir / f"benchmark_{run_timestamp}.log"
+    if log_file == _log_file and logger.handlers:
+        return logger
+
     logger.setLevel(logging.DEBUG)
 
-    # Remove existing handlers to avoid duplicates
+    # Remove (and close) existing handlers to avoid duplicates
+    for handler in logger.handlers:
+        handler.close()
     logger.handlers.clear()
 
     # Console handler with Rich
@@ -38,14 +61,11 @@ def setup_logger(run_timestamp: str) -> logging.Logger:
         console=Console(stderr=True),
     )
     console_handler.setLevel(logging.INFO)
-    console_format = logging.Formatter("%(message)s", datefmt="[%X]")
-    console_handler.setFormatter(console_format)
+    console_handler.setFormatter(CONSOLE_FORMAT)
 
     # File handler with rotation
-    logs_dir = get_logs_dir()
     logs_dir.mkdir(parents=True, exist_ok=True)
 
-    log_file = logs_dir / f"benchmark_{run_timestamp}.log"
     file_handler = RotatingFileHandler(
         log_file,
         maxBytes=10 * 1024 * 1024,  # 10 MB
@@ -53,15 +73,12 @@ def setup_logger(run_timestamp: str) -> logging.Logger:
         encoding="utf-8",
     )
     file_handler.setLevel(logging.DEBUG)
-    file_format = logging.Formatter(
-        "%(asctime)s | %(levelname)-8s | %(name)s:%(lineno)d | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-    file_handler.setFormatter(file_format)
+    file_handler.setFormatter(FILE_FORMAT)
 
     # Add handlers
     logger.addHandler(console_handler)
     logger.addHandler(file_handler)
+    _log_file = log_file
 
     logger.info(f"Logging initialized - Log file: {log_file}")
 
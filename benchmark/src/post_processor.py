@@ -1,17 +1,21 @@
 """Post-processor to extract SQL from LLM responses"""
 
-import json
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List
 
-from tqdm import tqdm
-
+from . import fast_json
 from .logger_config import get_logger
+from .streaming import iter_lines
 
 # Regex pattern to extract SQL from markdown code blocks
 SQL_PATTERN = re.compile(r"```[ \t]*sql\s*([\s\S]*?)```", re.IGNORECASE | re.DOTALL)
 
+# Large fields removed from responses to reduce file size (reasoning_content
+# only exists for some models)
+DROPPED_FIELDS = ("prompt", "_index", "reasoning_content")
+
 
 def extract_sql_from_response(response: str) -> List[str]:
     """
@@ -23,8 +27,29 @@ def extract_sql_from_response(response: str) -> List[str]:
     Returns:
         List of extracted SQL statements
     """
-    sql_statements = SQL_PATTERN.findall(response)
-    return [stmt.strip() for stmt in sql_statements if stmt.strip()]
+    return [sql for stmt in SQL_PATTERN.findall(response) if (sql := stmt.strip())]
+
+
+@lru_cache(maxsize=4)
+def _load_gold_solutions(path_str: str) -> Dict[str, dict]:
+    """
+    Load gold solutions keyed by instance_id (memoized per path).
+
+    Args:
+        path_str: Path to the gold solutions JSONL file, as a string so it
+            can be a cache key
+
+    Returns:
+        Dict mapping instance_id to its gold solution record
+    """
+    get_logger().info(f"Loading gold solutions from {path_str}")
+    with open(path_str, "r", encoding="utf-8") as f:
+        records = (fast_json.loads(line) for line in f)
+        return {
+            instance_id: sol_data
+            for sol_data in records
+            if (instance_id := sol_data.get("instance_id"))
+        }
 
 
 def process_responses_file(input_path: Path, output_path: Path) -> int:
@@ -42,59 +67,55 @@ def process_responses_file(input_path: Path, output_path: Path) -> int:
 
     logger.info(f"Processing responses from {input_path}")
 
-    # Read input file
-    with open(input_path, "r", encoding="utf-8") as f:
-        data_list = [json.loads(line) for line in f]
-
-    # Load gold solutions
-    gold_solutions = {}
+    # Load gold solutions (parsed once per process)
     gold_sol_path = Path(__file__).parent.parent / "data" / "pg_sol.jsonl"
 
     if gold_sol_path.exists():
-        logger.info(f"Loading gold solutions from {gold_sol_path}")
-        with open(gold_sol_path, "r", encoding="utf-8") as f:
-            for line in f:
-                sol_data = json.loads(line)
-                instance_id = sol_data.get("instance_id")
-                if instance_id:
-                    gold_solutions[instance_id] = sol_data
+        gold_solutions = _load_gold_solutions(str(gold_sol_path))
     else:
+        gold_solutions = {}
         logger.warning(f"Gold solutions file not found at {gold_sol_path}")
 
     # Process each instance
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        for data in tqdm(data_list, desc="Extracting SQL"):
-            response = data.get("response", "")
+    # Imported here so importing this module stays cheap
+    from tqdm import tqdm
+
+    num_processed = 0
+    num_merged = 0
 
-            # Extract SQL statements
-            sql_list = extract_sql_from_response(response)
+    # Responses are streamed line by line, so the file is never held in
+    # memory at once. It is read as bytes, as iter_lines() expects, and
+    # fast_json decodes each line
+    with open(input_path, "rb") as f_in, open(
+        output_path, "w", encoding="utf-8"
+    ) as f_out:
+        for line in tqdm(iter_lines(f_in), desc="Extracting SQL", unit="response"):
+            data = fast_json.loads(line)
 
             # Add extracted SQL to data
-            data["pred_sqls"] = sql_list
+            data["pred_sqls"] = extract_sql_from_response(data.get("response", ""))
 
             # Merge gold solution if available
-            instance_id = data.get("instance_id")
-            if instance_id and instance_id in gold_solutions:
-                gold_data = gold_solutions[instance_id]
+            gold_data = gold_solutions.get(data.get("instance_id"))
+            if gold_data is not None:
                 data["sol_sql"] = gold_data.get("sol_sql", [])
                 data["test_cases"] = gold_data.get("test_cases", [])
+                num_merged += 1
 
             # Remove large fields to reduce file size
-            data.pop("prompt", None)
-            data.pop("_index", None)
-            data.pop("reasoning_content", None)  # If exists from some models
+            for field in DROPPED_FIELDS:
+                data.pop(field, None)
 
             # Write to output
-            f.write(json.dumps(data, ensure_ascii=False) + "\n")
+            f_out.write(fast_json.dumps_line(data))
+            num_processed += 1
 
-    logger.info(f"✓ Processed {len(data_list)} responses and saved to {output_path}")
-    logger.info(
-        f"  Merged {len([d for d in data_list if d.get('instance_id') in gold_solutions])} gold solutions"
-    )
+    logger.info(f"✓ Processed {num_processed} responses and saved to {output_path}")
+    logger.info(f"  Merged {num_merged} gold solutions")
 
-    return len(data_list)
+    return num_processed
 
 
 def load_processed_data(output_path: Path) -> List[Dict[str, Any]]:
@@ -108,7 +129,7 @@ def load_processed_data(output_path: Path) -> List[Dict[str, Any]]:
         List of data instances with pred_sqls
     """
     with open(output_path, "r", encoding="utf-8") as f:
-        return [json.loads(line) for line in f]
+        return [fast_json.loads(line) for line in f]
 
 
 if __name__ == "__main__":
@@ -7,6 +7,7 @@ import subprocess
 import sys
 import time
 
+import fast_json
 import psycopg2
 from logger import PrintLogger, log_section_footer, log_section_header
 from psycopg2 import OperationalError
@@ -431,7 +432,7 @@ def load_jsonl(file_path):
     """
     try:
         with open(file_path, "r") as file:
-            return [json.loads(line) for line in file]
+            return [fast_json.loads(line) for line in file]
     except Exception as e:
         print(f"Failed to load JSONL file: {e}")
         sys.exit(1)
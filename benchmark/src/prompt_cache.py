@@ -0,0 +1,93 @@
+"""On-disk cache of LLM responses keyed by model settings and prompt"""
+
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from . import fast_json
+
+
+class PromptCache:
+    """
+    Response cache stored as one JSON file per prompt.
+
+    Files live in <cache_dir>/<first two hex chars>/<sha256>.json and hold
+    {prompt, response, model_id, ts}. Writes go through a temporary file and
+    os.replace(), so concurrent worker threads (or runs) never see a
+    partially written entry.
+    """
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize the prompt cache.
+
+        Args:
+            cache_dir: Directory to store cached responses in
+        """
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def make_key(model_id: str, max_tokens: int, prompt: str) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            model_id: pydantic-ai model id
+            max_tokens: Output token cap the response was generated with
+            prompt: Prompt text
+
+        Returns:
+            Hex SHA-256 digest identifying the request
+        """
+        payload = fast_json.dumps([model_id, max_tokens, prompt])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            Cached response text, or None on a miss (or an unreadable entry)
+        """
+        try:
+            with open(self._path(key), "rb") as f:
+                return fast_json.loads(f.read())["response"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key: str, model_id: str, prompt: str, response: str) -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Key from make_key()
+            model_id: pydantic-ai model id
+            prompt: Prompt text
+            response: Model response text
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        record: Dict[str, Any] = {
+            "prompt": prompt,
+            "response": response,
+            "model_id": model_id,
+            "ts": time.time(),
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(fast_json.dumps(record))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
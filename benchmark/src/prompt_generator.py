@@ -1,13 +1,16 @@
 """Prompt generator for SEQUEL2SQL Benchmark"""
 
-import json
+from itertools import islice
 from pathlib import Path
+from string import Formatter
 from typing import Any, Dict, List
 
-from tqdm import tqdm
-
+from . import fast_json
 from .logger_config import get_logger
 
+# Fields added to each input record in the prompts file
+OUTPUT_FIELDS = ("prompt", "_index")
+
 # Prompt template for PostgreSQL (baseline_v1 from bird-critic)
 BASELINE_PROMPT_TEMPLATE = """You are a SQL assistant. Your task is to understand user issue and correct their problematic SQL given the database schema. Please wrap your corrected SQL with ```sql\n[Your Fixed SQL]\n``` tags in your response.
 
@@ -23,6 +26,13 @@ BASELINE_PROMPT_TEMPLATE = """You are a SQL assistant. Your task is to understan
 # Corrected SQL:
 """
 
+# The template's literal text around its {schema}, {user_issue} and
+# {issue_sql} fields (in that order), split once so generate_prompt() only
+# has to join strings
+_PROMPT_LITERALS = tuple(
+    literal for literal, _, _, _ in Formatter().parse(BASELINE_PROMPT_TEMPLATE)
+)
+
 
 def generate_prompt(
     data: Dict[str, Any], schema_field: str = "preprocess_schema"
@@ -41,16 +51,51 @@ def generate_prompt(
     issue_sql_list = data["issue_sql"]
 
     # Format issue SQL with code blocks
-    issue_sql_str = ""
-    for sql in issue_sql_list:
-        issue_sql_str += f"```sql\n{sql}\n```\n"
-
-    # Generate prompt using template
-    prompt = BASELINE_PROMPT_TEMPLATE.format(
-        schema=data[schema_field], user_issue=problem_statement, issue_sql=issue_sql_str
+    issue_sql_str = "".join([f"```sql\n{sql}\n```\n" for sql in issue_sql_list])
+
+    # Generate prompt by filling the template's fields in order
+    head, before_issue, before_sql, tail = _PROMPT_LITERALS
+    return "".join(
+        (
+            head,
+            data[schema_field],
+            before_issue,
+            problem_statement,
+            before_sql,
+            issue_sql_str,
+            tail,
+        )
     )
 
-    return prompt
+
+def _generate_prompt_line(line: str, schema_field: str, index: int) -> str:
+    """
+    Turn one raw input JSONL line into a prompt JSONL line.
+
+    Args:
+        line: Raw JSONL line from the input file
+        schema_field: Field name containing the schema
+        index: Query index of the line
+
+    Returns:
+        Serialized output line (newline-terminated)
+    """
+    data = fast_json.loads(line)
+
+    # Generate prompt
+    prompt = generate_prompt(data, schema_field)
+
+    # Append prompt and index to the raw input object, so its fields (the
+    # schema above all) aren't re-encoded; records that already carry either
+    # field are re-serialized so it's replaced, not repeated
+    head = line.rstrip()
+    if data and head.endswith("}") and data.keys().isdisjoint(OUTPUT_FIELDS):
+        encoded_prompt = fast_json.dumps(prompt)
+        return f'{head[:-1]},"prompt":{encoded_prompt},"_index":{index}}}\n'
+
+    data["prompt"] = prompt
+    data["_index"] = index
+    return fast_json.dumps_line(data)
 
 
 def generate_prompts_from_file(
@@ -73,35 +118,31 @@ def generate_prompts_from_file(
     """
     logger = get_logger()
 
-    # Load data
-    logger.info(f"Loading data from {input_path}")
-    with open(input_path, "r", encoding="utf-8") as f:
-        data_list = [json.loads(line) for line in f]
-
-    if limit:
-        data_list = data_list[:limit]
-
-    logger.info(f"Generating prompts for {len(data_list)} instances...")
-
-    # Generate prompts
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        for i, data in enumerate(tqdm(data_list, desc="Generating prompts")):
-            # Generate prompt
-            prompt = generate_prompt(data, schema_field)
+    logger.info(f"Streaming data from {input_path}")
 
-            # Create output instance with prompt and index
-            output_instance = data.copy()
-            output_instance["prompt"] = prompt
-            output_instance["_index"] = i
+    # Imported here so importing this module (e.g. for load_prompts) stays cheap
+    from tqdm import tqdm
 
-            # Write to file
-            f.write(json.dumps(output_instance, ensure_ascii=False) + "\n")
+    # Lines are read lazily, so the input file is never held in memory at once.
+    # This runs in the calling process: each line is one template fill spliced
+    # into the raw JSON, and with the full dataset done in a fraction of a
+    # second, worker start-up and pickling lines across would cost more
+    num_prompts = 0
+    with open(input_path, "r", encoding="utf-8") as f_in, open(
+        output_path, "w", encoding="utf-8"
+    ) as f_out:
+        lines = islice(f_in, limit or None)
+        for index, line in enumerate(
+            tqdm(lines, total=limit, desc="Generating prompts", unit="prompt")
+        ):
+            f_out.write(_generate_prompt_line(line, schema_field, index))
+            num_prompts += 1
 
-    logger.info(f"✓ Generated {len(data_list)} prompts and saved to {output_path}")
+    logger.info(f"✓ Generated {num_prompts} prompts and saved to {output_path}")
 
-    return len(data_list)
+    return num_prompts
 
 
 def load_prompts(prompts_path: Path) -> List[Dict[str, Any]]:
@@ -115,7 +156,7 @@ def load_prompts(prompts_path: Path) -> List[Dict[str, Any]]:
         List of prompt instances
     """
     with open(prompts_path, "r", encoding="utf-8") as f:
-        return [json.loads(line) for line in f]
+        return [fast_json.loads(line) for line in f]
 
 
 if __name__ == "__main__":
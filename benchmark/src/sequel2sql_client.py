@@ -11,11 +11,13 @@ a single ```sql ... ``` block, which the benchmark post-processor can
 extract identically to responses from Google/Mistral.
 """
 
+import hashlib
 import importlib.util
 import sys
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import logfire
 
@@ -51,8 +53,32 @@ if "_s2s_sqlagent" not in sys.modules:
 _sqlagent = sys.modules["_s2s_sqlagent"]
 agent = _sqlagent.agent
 get_database_deps = _sqlagent.get_database_deps
+warm_up_pipeline = _sqlagent.warm_up
 
+# Identifies the pipeline in prompt cache keys, so changing the agent's model
+# or system prompt doesn't serve responses cached for the old one
+PIPELINE_ID = "{}#{}".format(
+    _sqlagent.DEFAULT_MODEL,
+    hashlib.sha256(_sqlagent.BENCHMARK_PROMPT.encode("utf-8")).hexdigest()[:12],
+)
+
+from . import fast_json
+from .api_client import (
+    MAX_BACKOFF,
+    backoff_delay,
+    build_model_settings,
+    build_rate_limiter,
+    build_token_budget,
+    classify_error,
+    parse_retry_after,
+)
+from .config import get_outputs_dir
 from .logger_config import get_logger
+from .prompt_cache import PromptCache
+
+# Number of databases whose AgentDeps (engine + reflected schema) are kept
+# between queries; each holds a connection pool, so older ones are disposed
+DEPS_CACHE_SIZE = 8
 
 
 class Sequel2SQLClient:
@@ -71,26 +97,72 @@ class Sequel2SQLClient:
         self.model_config = model_config
         self.logger = get_logger()
 
+        # Per-request bounds shared with LLMClient
+        self.model_settings = build_model_settings(model_config)
+        self.max_retries = model_config.get("max_retries", 3)
+        self.token_budget = build_token_budget(model_config)
+        self.rate_limiter = build_rate_limiter(model_config)
+
+        # Pipeline outputs share LLMClient's on-disk response cache
+        self.prompt_cache = (
+            PromptCache(get_outputs_dir() / "prompt_cache")
+            if model_config.get("prompt_cache")
+            else None
+        )
+
         # Statistics (mirrors LLMClient)
         self.total_requests = 0
         self.successful_requests = 0
         self.failed_requests = 0
+        self.cache_hits = 0
+
+        # AgentDeps per db_id, least recently used first. Calls run one at a
+        # time (max_concurrent_requests is 1 for this provider), so an evicted
+        # engine is never in use when it is disposed
+        self._deps: "OrderedDict[str, Any]" = OrderedDict()
+
+        # Load the embedding model etc. once, before the first query
+        warm_up_pipeline()
 
         self.logger.info(
             f"Initialized Sequel2SQLClient: {model_config['display_name']}"
         )
 
+    def _get_deps(self, db_id: str) -> Any:
+        """
+        Get AgentDeps for a database, reused across queries on the same db_id.
+
+        Building them creates an engine and reflects the whole schema, so the
+        DEPS_CACHE_SIZE most recently used are kept; evicted engines are
+        disposed to release their pooled connections.
+        """
+        deps = self._deps.get(db_id)
+        if deps is not None:
+            self._deps.move_to_end(db_id)
+            return deps
+
+        deps = get_database_deps(db_id)
+        self._deps[db_id] = deps
+        while len(self._deps) > DEPS_CACHE_SIZE:
+            _, old = self._deps.popitem(last=False)
+            old.database.engine.dispose()
+        return deps
+
     def call_api_with_data(
-        self, task_data: Dict[str, Any], max_retries: int = 3
+        self, task_data: Dict[str, Any], max_retries: Optional[int] = None
     ) -> str:
         """
         Run the Sequel2SQL agent pipeline on a single benchmark task.
 
+        Outputs already in the prompt cache (same pipeline, db_id and query)
+        are returned without running the pipeline.
+
         Args:
             task_data: A benchmark row dict with at minimum:
                 - "db_id"    — PostgreSQL database name
                 - "query"    — Natural-language question / user intent
             max_retries: Number of retry attempts on transient errors
+                (defaults to the run config's max_retries)
 
         Returns:
             Agent response string (a ```sql ... ``` block per BENCHMARK_PROMPT)
@@ -101,6 +173,22 @@ class Sequel2SQLClient:
         db_id = task_data.get("db_id", "postgres")
         query = task_data.get("query", "")
 
+        if max_retries is None:
+            max_retries = self.max_retries
+
+        cache = self.prompt_cache
+        if cache is not None:
+            cache_prompt = fast_json.dumps([db_id, query])
+            cache_key = PromptCache.make_key(
+                PIPELINE_ID,
+                self.model_config.get("max_output_tokens", 1024),
+                cache_prompt,
+            )
+            cached = cache.get(cache_key)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+
         last_error = None
 
         with logfire.span(
@@ -110,46 +198,53 @@ class Sequel2SQLClient:
         ) as span:
             for attempt in range(1, max_retries + 1):
                 try:
+                    if self.token_budget:
+                        self.token_budget.wait()
+                    if self.rate_limiter:
+                        self.rate_limiter.wait()
                     self.total_requests += 1
 
-                    # Build database deps for this specific database
-                    deps = get_database_deps(db_id)
+                    # Database deps for this specific database (cached)
+                    deps = self._get_deps(db_id)
 
                     # Run the full agent pipeline (tools: schema lookup, validation,
                     # few-shot retrieval, SQL analysis)
-                    result = agent.run_sync(query, deps=deps)
+                    result = agent.run_sync(
+                        query, deps=deps, model_settings=self.model_settings
+                    )
 
                     self.successful_requests += 1
+                    if self.token_budget:
+                        self.token_budget.record(result.usage().total_tokens)
                     span.set_attribute("attempts", attempt)
-                    time.sleep(1)  # respect 1 req/sec rate limit
-                    return str(result.output)
+                    output = str(result.output)
+                    if cache is not None:
+                        cache.put(cache_key, PIPELINE_ID, cache_prompt, output)
+                    return output
 
                 except Exception as e:
                     last_error = e
                     self.logger.debug(
                         f"Pipeline call failed (attempt {attempt}/{max_retries}): {str(e)[:120]}"
                     )
-                    error_str = str(e).lower()
-
-                    if (
-                        "429" in error_str
-                        or "rate" in error_str
-                        or "quota" in error_str
-                    ):
-                        wait = 15 * attempt
+                    error_kind = classify_error(e)
+
+                    if error_kind == "rate":
+                        # Honor the server's retry delay when it gives one
+                        wait = min(
+                            parse_retry_after(e) or backoff_delay(attempt),
+                            MAX_BACKOFF,
+                        )
                         self.logger.warning(
-                            f"⚠️  Rate limit hit. Waiting {wait}s before retry {attempt}/{max_retries}..."
+                            f"⚠️  Rate limit hit. Waiting {wait:.1f}s before retry {attempt}/{max_retries}..."
                         )
                         time.sleep(wait)
-                    elif (
-                        "500" in error_str
-                        or "503" in error_str
-                        or "server" in error_str
-                    ):
+                    elif error_kind == "server":
+                        wait = backoff_delay(attempt)
                         self.logger.warning(
-                            f"⚠️  Server error. Waiting 5s before retry {attempt}/{max_retries}..."
+                            f"⚠️  Server error. Waiting {wait:.1f}s before retry {attempt}/{max_retries}..."
                         )
-                        time.sleep(5)
+                        time.sleep(wait)
                     elif attempt < max_retries:
                         time.sleep(2)
 
@@ -170,6 +265,7 @@ class Sequel2SQLClient:
             "total_requests": self.total_requests,
             "successful_requests": self.successful_requests,
             "failed_requests": self.failed_requests,
+            "cache_hits": self.cache_hits,
             "success_rate": (
                 self.successful_requests / self.total_requests * 100
                 if self.total_requests > 0
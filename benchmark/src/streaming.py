@@ -0,0 +1,29 @@
+"""Helper for streaming large JSONL files line by line"""
+
+import mmap
+import os
+from typing import BinaryIO, Iterator
+
+# Files at least this large are read through mmap by iter_lines()
+MMAP_THRESHOLD = 16 << 20
+
+
+def iter_lines(f: BinaryIO) -> Iterator[bytes]:
+    """
+    Iterate over the lines of a file opened in binary mode.
+
+    Large files are read through a read-only mmap, which skips the copy into
+    the file object's read buffer; smaller ones use the buffered iterator.
+
+    Args:
+        f: File object opened with "rb"
+
+    Yields:
+        Lines as bytes (including the trailing newline)
+    """
+    if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+        yield from f
+        return
+
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield from iter(mm.readline, b"")
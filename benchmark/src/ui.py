@@ -286,7 +286,9 @@ def confirm_delete(run: Dict[str, Any]) -> bool:
     return answer
 
 
-def display_config_summary(config: Dict[str, Any], total_queries: int) -> None:
+def display_config_summary(
+    config: Dict[str, Any], total_queries: int, use_batch_api: bool = False
+) -> None:
     """Display configuration summary."""
     table = Table(show_header=False, box=None, padding=(0, 2))
     table.add_column("Field", style="bold cyan")
@@ -298,7 +300,14 @@ def display_config_summary(config: Dict[str, Any], total_queries: int) -> None:
     )
     table.add_row("Provider", config.get("provider", "Unknown").capitalize())
     table.add_row("Total Queries", str(total_queries))
-    table.add_row("Processing", "Sequential (one query at a time)")
+    max_concurrent = config.get("max_concurrent_requests", 1)
+    if use_batch_api:
+        processing = "Batch API (one provider batch job)"
+    elif max_concurrent == 1:
+        processing = "Sequential (one query at a time)"
+    else:
+        processing = f"Concurrent ({max_concurrent} queries in flight)"
+    table.add_row("Processing", processing)
 
     console.print(Panel(table, title="[bold]Configuration[/bold]", border_style="blue"))
     console.print()
@@ -7,8 +7,10 @@ Includes synchronization mechanisms to prevent database template conflicts.
 """
 
 import argparse
+import hashlib
 import json
 import os
+import signal
 import sys
 import subprocess
 import tempfile
@@ -19,11 +21,16 @@ import threading
 from datetime import datetime
 from tqdm import tqdm
 from postgresql_utils import (
+    close_all_postgresql_pools,
     load_jsonl,
     save_report_and_status,
     generate_category_report,
 )
-from logger import configure_logger
+from logger import configure_logger, NullLogger
+import fast_json
+
+# Per-instance time limit, for both the subprocess and the in-process path
+INSTANCE_TIMEOUT = 300
 
 # Create a dictionary to store database locks
 db_template_locks = {}
@@ -97,7 +104,7 @@ def run_instance(instance_data, instance_id, args, idx):
                 capture_output=True,
                 text=True,
                 check=False,
-                timeout=300,  # 5 minute timeout per instance
+                timeout=INSTANCE_TIMEOUT,  # 5 minute timeout per instance
             )
             success = result.returncode == 0
             if not success:
@@ -107,7 +114,9 @@ def run_instance(instance_data, instance_id, args, idx):
                 print(f"[Thread {idx}] STDOUT: {result.stdout[:500]}...")
                 print(f"[Thread {idx}] STDERR: {result.stderr[:500]}...")
         except subprocess.TimeoutExpired:
-            print(f"[Thread {idx}] Instance {instance_id} timed out after 300 seconds")
+            print(
+                f"[Thread {idx}] Instance {instance_id} timed out after {INSTANCE_TIMEOUT} seconds"
+            )
             success = False
 
         # Add a short delay to ensure database operations are completely finished
@@ -154,6 +163,125 @@ def run_instance(instance_data, instance_id, args, idx):
     }
 
 
+class InstanceTimeout(BaseException):
+    """Raised by the alarm when an in-process instance overruns INSTANCE_TIMEOUT.
+
+    A BaseException, so the evaluator's own `except Exception` handlers don't
+    swallow it, while its `finally` blocks still reset the database.
+    """
+
+
+def _raise_instance_timeout(signum, frame):
+    raise InstanceTimeout(f"timed out after {INSTANCE_TIMEOUT} seconds")
+
+
+def run_instance_in_process(instance_data, instance_id, args):
+    """Evaluate a single instance in this interpreter (used when num_threads == 1)"""
+    from single_instance_eval_postgresql import evaluate_instance
+
+    db_name = instance_data.get("db_id", "") or "unknown_db"
+
+    if args.logging == "true":
+        log_dir = os.path.dirname(os.path.abspath(args.jsonl_file))
+        logger = configure_logger(os.path.join(log_dir, f"instance_{instance_id}.log"))
+    else:
+        logger = NullLogger()
+
+    # SIGALRM stands in for the subprocess timeout. It is only available on
+    # POSIX and can only be set from the main thread
+    use_alarm = (
+        hasattr(signal, "SIGALRM")
+        and threading.current_thread() is threading.main_thread()
+    )
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_instance_timeout)
+
+    with get_db_lock(db_name):
+        try:
+            if use_alarm:
+                signal.alarm(INSTANCE_TIMEOUT)
+            evaluation_result = evaluate_instance(instance_data, args, logger)
+        except KeyboardInterrupt:
+            raise
+        except BaseException as e:
+            # Anything else (a timeout, SystemExit from a helper, ...) only
+            # fails this instance, as a crashed subprocess would
+            print(f"Error evaluating instance {instance_id}: {e!r}")
+
+            # The pooled connections may be mid-query or broken; drop them
+            # like the exiting subprocess would, and give the server a moment
+            # to end their backends before the next instance resets the database
+            try:
+                close_all_postgresql_pools()
+            except Exception:
+                pass
+            time.sleep(1)
+
+            return {
+                "instance_id": instance_id,
+                "status": "failed",
+                "error_message": f"Failed to evaluate instance: {str(e)}",
+                "total_test_cases": len(instance_data.get("test_cases", [])),
+                "passed_test_cases": 0,
+                "failed_test_cases": [],
+                "evaluation_phase_execution_error": True,
+                "evaluation_phase_timeout_error": False,
+                "evaluation_phase_assertion_error": False,
+            }
+        finally:
+            if use_alarm:
+                signal.alarm(0)
+                signal.signal(signal.SIGALRM, previous_handler)
+
+            # The subprocess path gets this for free when the interpreter exits
+            for handler in getattr(logger, "handlers", [])[:]:
+                handler.close()
+                logger.removeHandler(handler)
+
+    evaluation_result["instance_id"] = instance_id
+    return evaluation_result
+
+
+def instance_digest(instance_data, mode):
+    """Digest of everything an instance's evaluation depends on (record and mode)"""
+    return hashlib.sha256(
+        fast_json.dumps([mode, instance_data]).encode("utf-8")
+    ).hexdigest()
+
+
+def load_partial_results(partial_results_file, digests):
+    """
+    Load per-instance results saved by an interrupted run, keyed by instance_id.
+
+    A result is only reused if it was produced from the same instance record
+    (same predicted SQL, test cases, ...) as the one in digests.
+    """
+    results = {}
+    if not os.path.exists(partial_results_file):
+        return results
+
+    with open(partial_results_file, "r") as f:
+        for line in f:
+            try:
+                entry = fast_json.loads(line)
+            except json.JSONDecodeError:
+                # The last line may be truncated if the run was killed mid-write
+                continue
+            result = entry.get("result")
+            if result is None:
+                continue
+            instance_id = result["instance_id"]
+            if digests.get(instance_id) == entry.get("digest"):
+                results[instance_id] = result
+    return results
+
+
+def save_partial_result(partial_file, result, digest):
+    """Append one instance result (with its instance digest) to the partial results file"""
+    partial_file.write(fast_json.dumps_line({"digest": digest, "result": result}))
+    partial_file.flush()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Wrapper script to run PostgreSQL evaluation cases using multiple threads."
@@ -244,59 +372,102 @@ def main():
             if db_groups[db_name]:
                 ordered_instances.append(db_groups[db_name].pop(0))
 
-    # Create dictionary to store results, using instance_id as key to ensure correct sorting
-    results_dict = {}
-
-    # Process instances in parallel
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
-        # Submit tasks
-        future_to_instance = {
-            executor.submit(
-                run_instance,
-                data,
-                data.get("instance_id", f"instance_{original_idx}"),
-                args,
-                thread_idx,  # Pass thread index for logging
-            ): (original_idx, data.get("instance_id", f"instance_{original_idx}"))
-            for thread_idx, (original_idx, data) in enumerate(ordered_instances)
-        }
-
-        # Process completed results
-        for future in tqdm(
-            concurrent.futures.as_completed(future_to_instance),
-            desc="Evaluating instances",
-            total=len(data_list),
-        ):
-            original_idx, instance_id = future_to_instance[future]
-            try:
-                result = future.result()
-                # Store result, using original index to ensure correct sorting
-                results_dict[instance_id] = result
-            except Exception as e:
-                logger.error(f"Error processing instance {instance_id}: {e}")
-                # Add failure result
-                error_result = {
-                    "instance_id": instance_id,
-                    "status": "failed",
-                    "error_message": f"Error in wrapper: {str(e)}",
-                    "total_test_cases": len(
-                        data_list[original_idx].get("test_cases", [])
-                    ),
-                    "passed_test_cases": 0,
-                    "failed_test_cases": [],
-                    "evaluation_phase_execution_error": True,
-                    "evaluation_phase_timeout_error": False,
-                    "evaluation_phase_assertion_error": False,
+    # Create dictionary to store results, using instance_id as key to ensure correct sorting.
+    # Results are also appended to a partial file as they complete, so a rerun
+    # after an interruption only evaluates the instances that are still missing
+    partial_results_file = f"{base_output_folder}_results.partial.jsonl"
+    digests = {
+        data.get("instance_id", f"instance_{i}"): instance_digest(data, args.mode)
+        for i, data in enumerate(data_list)
+    }
+    results_dict = load_partial_results(partial_results_file, digests)
+    if results_dict:
+        logger.info(f"Resuming: {len(results_dict)} instances already evaluated")
+        ordered_instances = [
+            (original_idx, data)
+            for original_idx, data in ordered_instances
+            if data.get("instance_id", f"instance_{original_idx}") not in results_dict
+        ]
+
+    with open(partial_results_file, "w") as partial_file:
+        # Rewrite what was kept, dropping any line truncated by the interruption
+        for instance_id, result in results_dict.items():
+            save_partial_result(partial_file, result, digests[instance_id])
+
+        if num_threads == 1:
+            # Nothing runs in parallel, so evaluate in this process instead of
+            # spawning a separate interpreter per instance
+            for original_idx, data in tqdm(
+                ordered_instances, desc="Evaluating instances"
+            ):
+                instance_id = data.get("instance_id", f"instance_{original_idx}")
+                results_dict[instance_id] = run_instance_in_process(
+                    data, instance_id, args
+                )
+                save_partial_result(
+                    partial_file, results_dict[instance_id], digests[instance_id]
+                )
+                gc.collect()
+        else:
+            # Process instances in parallel
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=num_threads
+            ) as executor:
+                # Submit tasks
+                future_to_instance = {
+                    executor.submit(
+                        run_instance,
+                        data,
+                        data.get("instance_id", f"instance_{original_idx}"),
+                        args,
+                        thread_idx,  # Pass thread index for logging
+                    ): (
+                        original_idx,
+                        data.get("instance_id", f"instance_{original_idx}"),
+                    )
+                    for thread_idx, (original_idx, data) in enumerate(ordered_instances)
                 }
-                results_dict[instance_id] = error_result
 
-            # Force garbage collection after each instance completes
-            gc.collect()
+                # Process completed results
+                for future in tqdm(
+                    concurrent.futures.as_completed(future_to_instance),
+                    desc="Evaluating instances",
+                    total=len(ordered_instances),
+                ):
+                    original_idx, instance_id = future_to_instance[future]
+                    try:
+                        result = future.result()
+                        # Store result, using original index to ensure correct sorting
+                        results_dict[instance_id] = result
+                    except Exception as e:
+                        logger.error(f"Error processing instance {instance_id}: {e}")
+                        # Add failure result
+                        error_result = {
+                            "instance_id": instance_id,
+                            "status": "failed",
+                            "error_message": f"Error in wrapper: {str(e)}",
+                            "total_test_cases": len(
+                                data_list[original_idx].get("test_cases", [])
+                            ),
+                            "passed_test_cases": 0,
+                            "failed_test_cases": [],
+                            "evaluation_phase_execution_error": True,
+                            "evaluation_phase_timeout_error": False,
+                            "evaluation_phase_assertion_error": False,
+                        }
+                        results_dict[instance_id] = error_result
+
+                    save_partial_result(
+                        partial_file, results_dict[instance_id], digests[instance_id]
+                    )
+
+                    # Force garbage collection after each instance completes
+                    gc.collect()
 
     # Sort results according to original order
     results = []
-    for data in data_list:
-        instance_id = data.get("instance_id", f"instance_{data_list.index(data)}")
+    for idx, data in enumerate(data_list):
+        instance_id = data.get("instance_id", f"instance_{idx}")
         if instance_id in results_dict:
             results.append(results_dict[instance_id])
         else:
@@ -356,19 +527,20 @@ def main():
 
     # Output JSONL with status
     output_jsonl_file = f"{base_output_folder}_output_with_status.jsonl"
+    results_by_id = {result.get("instance_id"): result for result in results}
     with open(output_jsonl_file, "w") as f:
         for data in data_list:
-            instance_id = data.get("instance_id")
-            for result in results:
-                if data.get("instance_id") == result.get("instance_id"):
-                    data["status"] = result["status"]
-                    data["error_message"] = result.get("error_message")
-                    # Remove potentially large fields
-                    data.pop("prompt", None)
-                    # data.pop("response", None)
-                    data.pop("reasoning_content", None)
-                    f.write(json.dumps(data, ensure_ascii=False) + "\n")
-                    break
+            result = results_by_id.get(data.get("instance_id"))
+            if result is None:
+                continue
+
+            data["status"] = result["status"]
+            data["error_message"] = result.get("error_message")
+            # Remove potentially large fields
+            data.pop("prompt", None)
+            # data.pop("response", None)
+            data.pop("reasoning_content", None)
+            f.write(fast_json.dumps_line(data))
 
     # Generate difficulty level performance report if requested
     if args.report == "true":
@@ -387,6 +559,9 @@ def main():
         )
         print(f"Difficulty report generated: {report_file_path}")
 
+    # All results are in the final outputs now
+    os.remove(partial_results_file)
+
     # Print summary to console
     print("\nEvaluation Summary:")
     print(f"Total instances: {total_instances}")
@@ -0,0 +1,16 @@
+"""Pytest configuration for the benchmark tests."""
+
+import sys
+from pathlib import Path
+
+# The benchmark's modules live in its own "src" package (as when main.py is
+# run from this directory), which shadows the repository's top-level src/
+BENCHMARK_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BENCHMARK_DIR))
+for name in [m for m in sys.modules if m == "src" or m.startswith("src.")]:
+    del sys.modules[name]
+
+# Bind "src" to the benchmark package now. When the whole repository is
+# collected, the root tests/ package later puts the repository root ahead of
+# BENCHMARK_DIR on sys.path; submodules resolve through the bound package
+import src  # noqa: E402,F401
@@ -0,0 +1,44 @@
+"""Tests for the retry helpers shared by the benchmark clients."""
+
+import pytest
+
+pytest.importorskip("pydantic_ai")
+
+from src.api_client import (  # noqa: E402
+    MAX_BACKOFF,
+    backoff_delay,
+    classify_error,
+    parse_retry_after,
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_classify_error_by_status_code():
+    assert classify_error(StatusError(429)) == "rate"
+    assert classify_error(StatusError(503)) == "server"
+    assert classify_error(StatusError(400)) == "other"
+
+
+def test_classify_error_by_message():
+    assert classify_error(Exception("RESOURCE_EXHAUSTED: quota")) == "rate"
+    assert classify_error(Exception("model overloaded")) == "server"
+    assert classify_error(Exception("invalid request")) == "other"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(Exception("Retry-After: 7")) == 7.0
+    assert parse_retry_after(Exception('"retryDelay": "17s"')) == 17.0
+    assert parse_retry_after(Exception("retry_delay { seconds: 3 }")) == 3.0
+    assert parse_retry_after(Exception("rate limited")) is None
+
+
+@pytest.mark.parametrize("attempt", [1, 2, 3, 10])
+def test_backoff_delay_is_bounded(attempt):
+    base = min(MAX_BACKOFF, 2**attempt)
+    for _ in range(20):
+        assert base / 2 <= backoff_delay(attempt) <= base * 1.5
@@ -0,0 +1,158 @@
+"""Tests for the Batch API inference engine, against a fake Mistral client."""
+
+import json
+import sys
+import types
+from types import SimpleNamespace
+
+import pytest
+
+from src import batch_inference
+from src.batch_inference import BatchInferenceEngine
+from src.checkpoint_manager import CheckpointManager
+
+MODEL_CONFIG = {
+    "provider": "mistral",
+    "model_id": "mistral:mistral-large-latest",
+    "display_name": "Mistral Large Latest",
+    "max_output_tokens": 1024,
+    "prompt_cache": False,
+}
+
+
+class FakeMistral:
+    """Just enough of the Mistral client for batch jobs."""
+
+    def __init__(self, api_key):
+        self.failing = set()
+        self.submitted = []  # custom_ids of every created job
+        self.downloads = 0
+        self._jobs = {}
+        self._files = {}
+        self.files = SimpleNamespace(upload=self._upload, download=self._download)
+        self.batch = SimpleNamespace(
+            jobs=SimpleNamespace(create=self._create, get=self._get)
+        )
+
+    def _upload(self, file, purpose):
+        file_id = f"file-{len(self._files)}"
+        self._files[file_id] = file["content"].read().decode("utf-8").splitlines()
+        return SimpleNamespace(id=file_id)
+
+    def _create(self, input_files, model, endpoint, metadata):
+        requests = [json.loads(line) for line in self._files[input_files[0]]]
+        custom_ids = [request["custom_id"] for request in requests]
+        self.submitted.append(custom_ids)
+
+        job_id = f"job-{len(self._jobs)}"
+        output_id = f"out-{job_id}"
+        self._files[output_id] = [self._result(cid) for cid in custom_ids]
+        self._jobs[job_id] = SimpleNamespace(
+            id=job_id,
+            status="SUCCESS",
+            output_file=output_id,
+            completed_requests=len(custom_ids),
+            total_requests=len(custom_ids),
+        )
+        return self._jobs[job_id]
+
+    def _result(self, custom_id):
+        if custom_id in self.failing:
+            return json.dumps(
+                {"custom_id": custom_id, "response": None, "error": "boom"}
+            )
+        content = f"```sql\nSELECT {custom_id};\n```"
+        return json.dumps(
+            {
+                "custom_id": custom_id,
+                "response": {
+                    "status_code": 200,
+                    "body": {"choices": [{"message": {"content": content}}]},
+                },
+            }
+        )
+
+    def _get(self, job_id):
+        return self._jobs[job_id]
+
+    def _download(self, file_id):
+        self.downloads += 1
+        return SimpleNamespace(iter_lines=lambda: iter(self._files[file_id]))
+
+
+@pytest.fixture
+def run_dir(tmp_path, monkeypatch):
+    monkeypatch.setitem(
+        sys.modules, "mistralai", types.SimpleNamespace(Mistral=FakeMistral)
+    )
+    monkeypatch.setattr(batch_inference, "load_api_key", lambda provider: "key")
+    monkeypatch.setattr(batch_inference, "get_outputs_dir", lambda: tmp_path)
+
+    prompts = tmp_path / "prompts.jsonl"
+    prompts.write_text(
+        "".join(
+            json.dumps({"instance_id": i, "prompt": f"prompt {i}", "_index": i}) + "\n"
+            for i in range(3)
+        ),
+        encoding="utf-8",
+    )
+    return tmp_path
+
+
+def read_responses(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_rerun_submits_only_failed_queries(run_dir):
+    checkpoint = CheckpointManager(run_dir)
+    engine = BatchInferenceEngine(MODEL_CONFIG, checkpoint)
+    engine.client.failing = {"1"}
+    responses = run_dir / "responses.jsonl"
+
+    assert engine.submit_and_wait(run_dir / "prompts.jsonl", responses) == 2
+    assert engine.client.submitted == [["0", "1", "2"]]
+    assert checkpoint.get_batch_job_id() is None
+    assert checkpoint.get_failed_indices() == {1}
+
+    engine = BatchInferenceEngine(MODEL_CONFIG, CheckpointManager(run_dir))
+    assert engine.submit_and_wait(run_dir / "prompts.jsonl", responses) == 1
+    assert engine.client.submitted == [["1"]]
+    assert sorted(r["_index"] for r in read_responses(responses)) == [0, 1, 2]
+
+    engine = BatchInferenceEngine(MODEL_CONFIG, CheckpointManager(run_dir))
+    assert engine.submit_and_wait(run_dir / "prompts.jsonl", responses) == 0
+    assert engine.client.submitted == []
+
+
+def test_resume_repolls_submitted_job(run_dir):
+    checkpoint = CheckpointManager(run_dir)
+    engine = BatchInferenceEngine(MODEL_CONFIG, checkpoint)
+    job_id = engine._submit(
+        [{"prompt": f"prompt {i}"} for i in range(3)], [0, 1, 2], run_dir
+    )
+    checkpoint.set_batch_job_id(job_id)
+
+    engine.client.submitted.clear()
+    responses = run_dir / "responses.jsonl"
+    assert engine.submit_and_wait(run_dir / "prompts.jsonl", responses) == 3
+    assert engine.client.submitted == []
+    assert engine.client.downloads == 1
+    assert checkpoint.get_batch_job_id() is None
+
+
+def test_cached_responses_are_not_submitted(run_dir):
+    config = {**MODEL_CONFIG, "prompt_cache": True}
+    responses = run_dir / "responses.jsonl"
+
+    engine = BatchInferenceEngine(config, CheckpointManager(run_dir))
+    engine.client.failing = {"2"}
+    assert engine.submit_and_wait(run_dir / "prompts.jsonl", responses) == 2
+
+    # A fresh run over the same prompts only needs the uncached one
+    fresh_dir = run_dir / "fresh"
+    fresh_dir.mkdir()
+    fresh_responses = fresh_dir / "responses.jsonl"
+    engine = BatchInferenceEngine(config, CheckpointManager(fresh_dir))
+    assert engine.submit_and_wait(run_dir / "prompts.jsonl", fresh_responses) == 3
+    assert engine.client.submitted == [["2"]]
+    assert read_responses(fresh_responses)[0]["response"] == "```sql\nSELECT 0;\n```"
@@ -0,0 +1,107 @@
+"""Tests for the benchmark checkpoint manager."""
+
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from src.checkpoint_manager import CheckpointManager
+
+BENCHMARK_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_save_writes_checkpoint_atomically(tmp_path):
+    manager = CheckpointManager(tmp_path)
+    manager.set_total_queries(5)
+    manager.update_progress(0)
+    manager.update_progress(3, failed=True)
+    manager.save()
+
+    data = json.loads((tmp_path / "checkpoint.json").read_text(encoding="utf-8"))
+    assert data["completed_indices"] == [0]
+    assert data["failed_indices"] == [3]
+    assert data["failed_queries"] == 1
+    assert not (tmp_path / "checkpoint.json.tmp").exists()
+
+
+def test_resume_from_saved_checkpoint(tmp_path):
+    manager = CheckpointManager(tmp_path)
+    for i in (0, 1, 4):
+        manager.update_progress(i)
+    manager.save()
+
+    resumed = CheckpointManager(tmp_path)
+    assert resumed.get_completed_indices() == {0, 1, 4}
+    assert resumed.get_remaining_queries(6) == [2, 3, 5]
+
+
+def test_updates_are_written_behind(tmp_path):
+    manager = CheckpointManager(tmp_path, flush_every=3, flush_secs=3600)
+    manager.save()
+
+    manager.update_progress(0)
+    manager.update_progress(1)
+    on_disk = CheckpointManager(tmp_path).get_completed_indices()
+    assert on_disk == set()
+
+    manager.update_progress(2)
+    on_disk = CheckpointManager(tmp_path).get_completed_indices()
+    assert on_disk == {0, 1, 2}
+
+
+def test_pending_updates_are_saved_at_exit(tmp_path):
+    script = textwrap.dedent(f"""
+        from pathlib import Path
+        from src.checkpoint_manager import CheckpointManager
+
+        manager = CheckpointManager(
+            Path({str(tmp_path)!r}), flush_every=100, flush_secs=3600
+        )
+        manager.update_progress(7)
+        """)
+    subprocess.run([sys.executable, "-c", script], cwd=BENCHMARK_DIR, check=True)
+
+    assert CheckpointManager(tmp_path).get_completed_indices() == {7}
+
+
+def test_clear_then_save_starts_over(tmp_path):
+    manager = CheckpointManager(tmp_path)
+    manager.set_total_queries(4)
+    manager.update_progress(0)
+    manager.update_progress(1, failed=True)
+    manager.save()
+
+    manager.clear()
+    assert not manager.checkpoint_exists()
+    assert manager.get_completed_indices() == set()
+    assert manager.get_failed_count() == 0
+
+    manager.update_progress(2)
+    manager.save()
+    data = json.loads((tmp_path / "checkpoint.json").read_text(encoding="utf-8"))
+    assert data["completed_indices"] == [2]
+    assert data["failed_indices"] == []
+    assert data["total_queries"] == 0
+
+
+def test_load_checkpoint_rereads_only_changed_file(tmp_path):
+    manager = CheckpointManager(tmp_path)
+    manager.update_progress(0)
+    manager.save()
+
+    data = manager.load_checkpoint()
+    assert data is manager.checkpoint_data
+
+    other = CheckpointManager(tmp_path)
+    other.update_progress(1)
+    other.save()
+    assert manager.load_checkpoint()["completed_indices"] == [0, 1]
+
+
+def test_corrupt_checkpoint_starts_fresh(tmp_path):
+    (tmp_path / "checkpoint.json").write_text('{"completed_queries": 3, "tot')
+
+    manager = CheckpointManager(tmp_path)
+    assert manager.get_completed_indices() == set()
+    assert manager.get_remaining_queries(2) == [0, 1]
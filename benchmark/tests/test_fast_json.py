@@ -0,0 +1,40 @@
+"""Tests that fast_json gives the same results with and without orjson."""
+
+import pytest
+
+from src import fast_json
+
+RECORD = {"instance_id": 3, "query": "café ✓", "sqls": ["SELECT 1;"], "ok": None}
+
+
+@pytest.fixture(params=["stdlib", "orjson"])
+def backend(request, monkeypatch):
+    """Run a test once per JSON backend."""
+    if request.param == "stdlib":
+        monkeypatch.setattr(fast_json, "orjson", None)
+    else:
+        monkeypatch.setattr(fast_json, "orjson", pytest.importorskip("orjson"))
+    return request.param
+
+
+def test_dumps_line_is_compact_utf8(backend):
+    assert fast_json.dumps_line(RECORD) == (
+        '{"instance_id":3,"query":"café ✓","sqls":["SELECT 1;"],"ok":null}\n'
+    )
+
+
+def test_dumps_indent(backend):
+    assert fast_json.dumps({"a": [1], "b": "é"}, indent=True) == (
+        '{\n  "a": [\n    1\n  ],\n  "b": "é"\n}'
+    )
+
+
+def test_loads_str_and_bytes(backend):
+    line = fast_json.dumps_line(RECORD)
+    assert fast_json.loads(line) == RECORD
+    assert fast_json.loads(line.encode("utf-8")) == RECORD
+
+
+def test_loads_rejects_truncated_line(backend):
+    with pytest.raises(ValueError):
+        fast_json.loads('{"instance_id": 3, "que')
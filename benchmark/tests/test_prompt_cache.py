@@ -0,0 +1,44 @@
+"""Tests for the on-disk prompt cache."""
+
+from src.prompt_cache import PromptCache
+
+
+def test_make_key_depends_on_every_field():
+    key = PromptCache.make_key("mistral:large", 1024, "prompt")
+    assert key == PromptCache.make_key("mistral:large", 1024, "prompt")
+    assert len(key) == 64
+
+    assert key != PromptCache.make_key("google-gla:gemma", 1024, "prompt")
+    assert key != PromptCache.make_key("mistral:large", 512, "prompt")
+    assert key != PromptCache.make_key("mistral:large", None, "prompt")
+    assert key != PromptCache.make_key("mistral:large", 1024, "prompt ")
+
+
+def test_put_then_get(tmp_path):
+    cache = PromptCache(tmp_path)
+    key = PromptCache.make_key("mistral:large", 1024, "SELECT café")
+
+    assert cache.get(key) is None
+    cache.put(key, "mistral:large", "SELECT café", "```sql\nSELECT 1;\n```")
+    assert cache.get(key) == "```sql\nSELECT 1;\n```"
+
+    # Sharded by the key's first two hex characters, no temp files left over
+    assert (tmp_path / key[:2] / f"{key}.json").exists()
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_put_overwrites(tmp_path):
+    cache = PromptCache(tmp_path)
+    key = PromptCache.make_key("m", 1, "p")
+    cache.put(key, "m", "p", "old")
+    cache.put(key, "m", "p", "new")
+    assert cache.get(key) == "new"
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = PromptCache(tmp_path)
+    key = PromptCache.make_key("m", 1, "p")
+    path = tmp_path / key[:2] / f"{key}.json"
+    path.parent.mkdir()
+    path.write_text('{"prompt": "p", "resp')
+    assert cache.get(key) is None
@@ -0,0 +1,53 @@
+"""Tests for streaming JSONL files line by line."""
+
+import json
+
+import pytest
+
+from src import post_processor, streaming
+from src.streaming import iter_lines
+
+LINES = [b'{"a": 1}\n', '{"b": "café"}\n'.encode("utf-8"), b'{"c": 3}']
+
+
+@pytest.fixture(params=["buffered", "mmap"])
+def read_mode(request, monkeypatch):
+    """Run a test once per iter_lines() branch."""
+    if request.param == "mmap":
+        monkeypatch.setattr(streaming, "MMAP_THRESHOLD", 0)
+    return request.param
+
+
+def test_iter_lines_yields_bytes(tmp_path, read_mode):
+    path = tmp_path / "data.jsonl"
+    path.write_bytes(b"".join(LINES))
+
+    with open(path, "rb") as f:
+        assert list(iter_lines(f)) == LINES
+
+
+def test_process_responses_file(tmp_path, read_mode):
+    responses = tmp_path / "responses.jsonl"
+    output = tmp_path / "final_output.jsonl"
+    records = [
+        {
+            "instance_id": 0,
+            "prompt": "p",
+            "_index": 0,
+            "response": "```sql\nSELECT 'café';\n```",
+        },
+        {"instance_id": 1, "response": "no sql here"},
+    ]
+    responses.write_text(
+        "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records),
+        encoding="utf-8",
+    )
+
+    assert post_processor.process_responses_file(responses, output) == 2
+
+    results = [
+        json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()
+    ]
+    assert results[0]["pred_sqls"] == ["SELECT 'café';"]
+    assert results[1]["pred_sqls"] == []
+    assert "prompt" not in results[0] and "_index" not in results[0]
@@ -0,0 +1,98 @@
+"""Tests for the evaluation wrapper's in-process path and partial results."""
+
+import sys
+import time
+from argparse import Namespace
+from pathlib import Path
+
+# The evaluation scripts import their siblings as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import single_instance_eval_postgresql  # noqa: E402
+import wrapper_evaluation_postgresql  # noqa: E402
+from wrapper_evaluation_postgresql import (  # noqa: E402
+    instance_digest,
+    load_partial_results,
+    run_instance_in_process,
+    save_partial_result,
+)
+
+INSTANCES = [
+    {"instance_id": 0, "db_id": "db", "pred_sqls": ["SELECT 1;"], "test_cases": []},
+    {"instance_id": 1, "db_id": "db", "pred_sqls": ["SELECT 2;"], "test_cases": []},
+]
+
+
+def digests_for(instances, mode="pred"):
+    return {data["instance_id"]: instance_digest(data, mode) for data in instances}
+
+
+def write_partial(path, instances):
+    digests = digests_for(instances)
+    with open(path, "w") as f:
+        for data in instances:
+            result = {"instance_id": data["instance_id"], "status": "success"}
+            save_partial_result(f, result, digests[data["instance_id"]])
+
+
+def test_results_are_reused_for_unchanged_instances(tmp_path):
+    partial = tmp_path / "run_results.partial.jsonl"
+    write_partial(partial, INSTANCES)
+
+    results = load_partial_results(str(partial), digests_for(INSTANCES))
+    assert set(results) == {0, 1}
+    assert results[0] == {"instance_id": 0, "status": "success"}
+
+
+def test_changed_predictions_are_evaluated_again(tmp_path):
+    partial = tmp_path / "run_results.partial.jsonl"
+    write_partial(partial, INSTANCES)
+
+    changed = [INSTANCES[0], {**INSTANCES[1], "pred_sqls": ["SELECT 3;"]}]
+    assert set(load_partial_results(str(partial), digests_for(changed))) == {0}
+
+    # Same records evaluated in the other mode don't match either
+    gold = digests_for(INSTANCES, mode="gold")
+    assert load_partial_results(str(partial), gold) == {}
+
+
+def test_truncated_and_missing_files(tmp_path):
+    partial = tmp_path / "run_results.partial.jsonl"
+    assert load_partial_results(str(partial), digests_for(INSTANCES)) == {}
+
+    write_partial(partial, INSTANCES)
+    partial.write_text(partial.read_text()[:-20])
+    assert set(load_partial_results(str(partial), digests_for(INSTANCES))) == {0}
+
+
+def run_in_process(monkeypatch, evaluate):
+    monkeypatch.setattr(single_instance_eval_postgresql, "evaluate_instance", evaluate)
+    monkeypatch.setattr(
+        wrapper_evaluation_postgresql, "close_all_postgresql_pools", lambda: None
+    )
+    monkeypatch.setattr(wrapper_evaluation_postgresql.time, "sleep", lambda secs: None)
+    args = Namespace(logging="false", mode="pred", jsonl_file="run.jsonl")
+    return run_instance_in_process(INSTANCES[0], 0, args)
+
+
+def test_in_process_crash_only_fails_the_instance(monkeypatch):
+    def evaluate(data, args, logger):
+        sys.exit(1)
+
+    result = run_in_process(monkeypatch, evaluate)
+    assert result["instance_id"] == 0
+    assert result["status"] == "failed"
+
+
+def test_in_process_instance_times_out(monkeypatch):
+    monkeypatch.setattr(wrapper_evaluation_postgresql, "INSTANCE_TIMEOUT", 1)
+
+    def evaluate(data, args, logger):
+        while True:
+            pass
+
+    start = time.monotonic()
+    result = run_in_process(monkeypatch, evaluate)
+    assert result["status"] == "failed"
+    assert "timed out" in result["error_message"]
+    assert time.monotonic() - start < 4
@@ -444,7 +444,7 @@ def wait_for_postgres(timeout: int = 60) -> bool:
     console.print("[bold cyan]Waiting for PostgreSQL to be ready...[/bold cyan]")
     console.print()
 
-    start_time = time.time()
+    start_time = time.monotonic()
 
     with Progress(
         SpinnerColumn(),
@@ -453,7 +453,7 @@ def wait_for_postgres(timeout: int = 60) -> bool:
     ) as progress:
         task = progress.add_task("Checking PostgreSQL health...", total=None)
 
-        while time.time() - start_time < timeout:
+        while time.monotonic() - start_time < timeout:
             try:
                 result = subprocess.run(
                     [
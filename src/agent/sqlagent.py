@@ -32,6 +32,7 @@ from src.database import execute_sql as _execute_sql  # noqa: E402
 from src.query_intent_vectordb.search_similar_query import (  # noqa: E402
     FewShotExample,
     find_similar_examples,
+    preload_embedding_model,
 )
 
 load_dotenv()
@@ -88,6 +89,17 @@ def get_database_deps(
     return AgentDeps(database=database, max_return_values=max_return_values)
 
 
+def warm_up() -> None:
+    """Pay one-time pipeline costs up front instead of on the first query.
+
+    Loads the few-shot embedding model and runs sqlglot's PostgreSQL
+    parser once, so concurrent first requests neither race to load the
+    model nor skew per-query timings.
+    """
+    preload_embedding_model()
+    validate_sql("SELECT 1", dialect="postgres")
+
+
 def _extract_table_names(sql: str, dialect: str) -> set[str]:
     """
     Best-effort extraction of table names from SQL query using sqlglot.
@@ -31,6 +31,14 @@ TAXONOMY_CATEGORIES: Dict[str, List[str]] = _ERROR_DATA["taxonomy_categories"]
 ERROR_PATTERNS: Dict[str, str] = _ERROR_DATA["error_patterns"]
 POSTGRES_SQLSTATE_TO_TAG: Dict[str, str] = _ERROR_DATA["postgres_sqlstate_to_tag"]
 
+# Compiled once at import; extract_error_code runs for every validation error.
+_SQLSTATE_RE = re.compile(
+    r'(?:SQLSTATE|ERROR)[\s:]*([0-9][0-9A-Z]{4})|\[([0-9][0-9A-Z]{4})\]', re.IGNORECASE
+)
+_ERROR_PATTERN_RES = [
+    (re.compile(pattern, re.IGNORECASE), code) for pattern, code in ERROR_PATTERNS.items()
+]
+
 
 # Class fallback when exact SQLSTATE unknown (first two chars).
 SQLSTATE_CLASS_FALLBACK: Dict[str, str] = {
@@ -46,14 +54,13 @@ SQLSTATE_CLASS_FALLBACK: Dict[str, str] = {
 
 def extract_error_code(error_message: str) -> Optional[str]:
     """Extract SQLSTATE from message; None if not found."""
-    sqlstate_pattern = r'(?:SQLSTATE|ERROR)[\s:]*([0-9][0-9A-Z]{4})|\[([0-9][0-9A-Z]{4})\]'
-    match = re.search(sqlstate_pattern, error_message, re.IGNORECASE)
+    match = _SQLSTATE_RE.search(error_message)
     if match:
         return (match.group(1) or match.group(2)).upper()
     
     error_lower = error_message.lower()
-    for pattern, code in ERROR_PATTERNS.items():
-        if re.search(pattern, error_lower, re.IGNORECASE):
+    for pattern, code in _ERROR_PATTERN_RES:
+        if pattern.search(error_lower):
             return code
     
     return None
@@ -2,23 +2,37 @@
 """Simplified SQL validation for LLM agent tool calls."""
 
 import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from ast_parsers.validator import validate_syntax, validate_schema
+from sqlglot.schema import MappingSchema
+
+from ast_parsers.validator import compile_schema, validate_syntax, validate_schema
 from ast_parsers.models import ValidationErrorOut
 
 # Path to schema JSON files
 SCHEMA_DIR = Path(__file__).parent.parent.parent / "benchmark" / "data" / "schemas"
 
 
+@lru_cache(maxsize=64)
 def _load_schema(db_name: str) -> Optional[Dict[str, Dict[str, str]]]:
-    """Load schema from JSON file if it exists."""
+    """Load schema from JSON file if it exists (parsed once per database).
+
+    The returned dict is shared between callers and must not be mutated.
+    """
     schema_path = SCHEMA_DIR / f"{db_name}.json"
-    if schema_path.exists():
-        with open(schema_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return None
+    try:
+        return json.loads(schema_path.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+@lru_cache(maxsize=64)
+def _load_compiled_schema(db_name: str, dialect: str) -> Optional[MappingSchema]:
+    """Schema for db_name as a sqlglot MappingSchema, built once per database."""
+    schema = _load_schema(db_name)
+    return compile_schema(schema, dialect=dialect) if schema is not None else None
 
 
 def validate_sql(
@@ -28,6 +42,9 @@ def validate_sql(
 ) -> List[ValidationErrorOut]:
     """Validate SQL syntax and optionally schema, returning only errors.
 
+    Results are memoized on (sql, db_name, dialect): validation is
+    deterministic, and the agent often re-validates the same query.
+
     Args:
         sql: SQL query string to validate.
         db_name: Optional database name (e.g., "california_schools_template").
@@ -37,14 +54,26 @@ def validate_sql(
     Returns:
         List of ValidationErrorOut. Empty list means the SQL is valid.
     """
-    schema = _load_schema(db_name) if db_name else None
+    # Deep copies, so callers can't mutate the cached errors (or their lists)
+    cached = _validate_sql_cached(sql, db_name, dialect)
+    return [e.model_copy(deep=True) for e in cached]
+
+
+@lru_cache(maxsize=1024)
+def _validate_sql_cached(
+    sql: str,
+    db_name: Optional[str],
+    dialect: str,
+) -> Tuple[ValidationErrorOut, ...]:
+    """Uncached validation behind validate_sql()."""
+    schema = _load_compiled_schema(db_name, dialect) if db_name else None
     
     if schema is not None:
         result = validate_schema(sql, schema, dialect=dialect)
     else:
         result = validate_syntax(sql, dialect=dialect)
 
-    return [
+    return tuple(
         ValidationErrorOut(
             tag=e.tag,
             message=e.message,
@@ -55,4 +84,4 @@ def validate_sql(
             affected_clauses=e.affected_clauses or [],
         )
         for e in result.errors
-    ]
+    )
@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 """SQL validation: syntax (sqlglot) and optional schema-aware semantic checks."""
 
-from typing import Optional, Dict, Any
+import re
+from typing import Optional, Dict, Any, Union
 
 import sqlglot
 from sqlglot import exp
 from sqlglot.errors import ParseError
 from sqlglot.optimizer import optimize
+from sqlglot.schema import MappingSchema
 
 from ast_parsers.errors import (
     ValidationResult,
@@ -23,6 +25,13 @@ from ast_parsers.query_analyzer import (
     analyze_query,
 )
 
+# Heuristic patterns, compiled once at import (checked on every validation).
+_EMPTY_SELECT_RE = re.compile(r'\bSELECT\s+FROM\b', re.IGNORECASE)
+_TRAILING_DELIMITER_RES = [
+    re.compile(rf',\s+{keyword}\b')
+    for keyword in ['FROM', 'WHERE', 'GROUP', 'ORDER', 'HAVING', 'LIMIT', 'UNION', 'JOIN']
+]
+
 
 def validate_syntax(
     sql: str,
@@ -42,15 +51,10 @@ def validate_syntax(
         return result
     
     except ParseError as e:
+        # No AST to attach: parsing is deterministic, so re-parsing the same
+        # SQL here would only raise the same ParseError again
         errors = _classify_syntax_error(sql, e)
-        result = ValidationResult(valid=False, errors=errors, sql=sql)
-        try:
-            ast = sqlglot.parse_one(sql, read=dialect)
-            result.ast = ast
-            result.query_metadata = analyze_query(ast)
-        except ParseError:
-            pass
-        return result
+        return ValidationResult(valid=False, errors=errors, sql=sql)
     
     except Exception as e:
         # Catch-all for unexpected parsing errors (including tokenization errors)
@@ -105,10 +109,8 @@ def _detect_silent_fixes(sql: str) -> list:
 
 def _has_empty_select(sql: str) -> bool:
     """Check if SQL has SELECT immediately followed by FROM (no columns)."""
-    import re
     # Match SELECT followed by optional whitespace, then FROM
-    pattern = r'\bSELECT\s+FROM\b'
-    return bool(re.search(pattern, sql, re.IGNORECASE))
+    return bool(_EMPTY_SELECT_RE.search(sql))
 
 
 def _classify_syntax_error(sql: str, error: ParseError) -> list:
@@ -219,12 +221,9 @@ def _get_unbalanced_context(sql: str) -> str:
 
 def _find_trailing_delimiter(sql: str, error_message: str) -> Optional[int]:
     """Return position of trailing comma before keyword (e.g. SELECT a, FROM t)."""
-    import re
-    keywords = ['FROM', 'WHERE', 'GROUP', 'ORDER', 'HAVING', 'LIMIT', 'UNION', 'JOIN']
     sql_upper = sql.upper()
-    for keyword in keywords:
-        pattern = rf',\s+{re.escape(keyword)}\b'
-        match = re.search(pattern, sql_upper)
+    for pattern in _TRAILING_DELIMITER_RES:
+        match = pattern.search(sql_upper)
         if match:
             comma_pos = match.start()
             before_comma = sql[:comma_pos].rstrip()
@@ -240,12 +239,24 @@ def _has_unterminated_string(sql: str) -> bool:
     return single_quotes % 2 != 0 or double_quotes % 2 != 0
 
 
+def compile_schema(
+    schema: Dict[str, Dict[str, str]],
+    dialect: str = "postgres",
+) -> MappingSchema:
+    """Build a reusable sqlglot schema once, for repeated validate_schema calls on one database."""
+    return MappingSchema(schema, dialect=dialect)
+
+
 def validate_schema(
     sql: str,
-    schema: Dict[str, Dict[str, str]],
+    schema: Union[Dict[str, Dict[str, str]], MappingSchema],
     dialect: str = "postgres",
 ) -> ValidationResult:
-    """Validate SQL against schema (tables/columns); requires valid syntax first."""
+    """Validate SQL against schema (tables/columns); requires valid syntax first.
+
+    schema may be a plain {table: {column: type}} dict or the result of
+    compile_schema(), which skips rebuilding sqlglot's schema per call.
+    """
     syntax_result = validate_syntax(sql, dialect=dialect)
     if not syntax_result.valid:
         # Return syntax errors immediately - can't validate schema on invalid SQL
@@ -309,9 +320,12 @@ def validate_schema(
     return result
 
 
-def _check_tables_exist(parsed: exp.Expression, schema: Dict) -> list:
+def _check_tables_exist(
+    parsed: exp.Expression, schema: Union[Dict, MappingSchema]
+) -> list:
     missing = []
-    schema_lower = {k.lower(): v for k, v in schema.items()}
+    tables = schema.mapping if isinstance(schema, MappingSchema) else schema
+    schema_lower = {k.lower() for k in tables}
     for table in parsed.find_all(exp.Table):
         if table.name.lower() not in schema_lower:
             missing.append(table.name)
@@ -10,13 +10,13 @@ import logging
 from pathlib import Path
 
 import chromadb
-from sentence_transformers import SentenceTransformer
+
+from query_intent_vectordb.embedding_model import get_embedding_model
 
 
 DATA_FILE = Path(__file__).parent / "query_intent_metadata.jsonl"
 CHROMA_PATH = Path(__file__).parents[1] / "chroma_db"
 COLLECTION_NAME = "query_intents"
-EMBEDDING_MODEL = "all-MiniLM-L6-v2"
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,7 +24,7 @@ logger = logging.getLogger(__name__)
 
 def embed_and_store() -> None:
     logger.info("Loading embedding model...")
-    model = SentenceTransformer(EMBEDDING_MODEL)
+    model = get_embedding_model()
 
     CHROMA_PATH.mkdir(parents=True, exist_ok=True)
 
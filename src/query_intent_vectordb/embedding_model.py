@@ -0,0 +1,24 @@
+"""Shared sentence-transformers embedding model for the query intent vector DB."""
+
+import logging
+from functools import lru_cache
+
+from sentence_transformers import SentenceTransformer
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def get_embedding_model() -> SentenceTransformer:
+    """
+    Load the embedding model once per process (shared by indexing and search).
+    Uses the local Hugging Face cache when possible and only goes to the
+    network the first time the model is needed on this machine.
+    """
+    try:
+        return SentenceTransformer(EMBEDDING_MODEL, local_files_only=True)
+    except Exception:
+        logger.info(f"{EMBEDDING_MODEL} not cached locally, downloading")
+        return SentenceTransformer(EMBEDDING_MODEL)
@@ -5,7 +5,9 @@ sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__f
 
 import json
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Optional, Tuple
 
 from datasets import load_dataset
 import sqlglot
@@ -18,6 +20,40 @@ logger = logging.getLogger(__name__)
 OUTPUT_FILE = Path(__file__).parent / "query_intent_metadata.jsonl"
 
 
+def _build_record(item: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """Parse and analyze one dataset row (module-level so worker processes can run it).
+
+    Returns (record, None), or (None, reason) for a skipped row; the reason is
+    returned rather than logged because worker processes have no log handlers.
+    """
+    sql_query = item.get("SQL")
+    intent = item.get("question")
+
+    if not sql_query or not intent:
+        return None, None
+
+    try:
+        ast = sqlglot.parse_one(sql_query, read="postgres")
+        metadata = analyze_query(ast)
+    except Exception as e:
+        return None, f"Skipping query due to parse error: {e}"
+
+    return {
+        "db_id": item.get("db_id"),
+        "intent": intent,
+        "sql": sql_query,
+        # --- metadata fields (from QueryMetadata dataclass) ---
+        "complexity_score": metadata.complexity_score,
+        "pattern_signature": metadata.pattern_signature,
+        "clauses_present": metadata.clauses_present,
+        "num_joins": metadata.num_joins,
+        "num_subqueries": metadata.num_subqueries,
+        "num_ctes": metadata.num_ctes,
+        "num_aggregations": metadata.num_aggregations,
+        "document_type": "query_intent_pairs",
+    }, None
+
+
 def process_dataset():
     logger.info("Loading BirdSQL mini_dev_pg dataset...")
     dataset = load_dataset("birdsql/bird_mini_dev", split="mini_dev_pg")
@@ -26,36 +62,15 @@ def process_dataset():
     
     logger.info(f"Writing {len(dataset)} records to {OUTPUT_FILE}")
 
-    with OUTPUT_FILE.open("w", encoding="utf-8") as f:
-        for item in dataset:
-            sql_query = item.get("SQL")
-            intent = item.get("question")
-
-            if not sql_query or not intent:
+    # Parsing is pure CPU work with no shared state, so rows are analyzed on
+    # all cores; map() keeps results in dataset order for a stable output file
+    with ProcessPoolExecutor() as executor, OUTPUT_FILE.open("w", encoding="utf-8") as f:
+        for record, skip_reason in executor.map(_build_record, dataset, chunksize=64):
+            if skip_reason:
+                logger.debug(skip_reason)
+            if record is None:
                 continue
 
-            try:
-                ast = sqlglot.parse_one(sql_query, read="postgres")
-                metadata = analyze_query(ast)
-            except Exception as e:
-                logger.debug(f"Skipping query due to parse error: {e}")
-                continue
-
-            record = {
-                "db_id": item.get("db_id"),
-                "intent": intent,
-                "sql": sql_query,
-                # --- metadata fields (from QueryMetadata dataclass) ---
-                "complexity_score": metadata.complexity_score,
-                "pattern_signature": metadata.pattern_signature,
-                "clauses_present": metadata.clauses_present,
-                "num_joins": metadata.num_joins,
-                "num_subqueries": metadata.num_subqueries,
-                "num_ctes": metadata.num_ctes,
-                "num_aggregations": metadata.num_aggregations,
-                "document_type": "query_intent_pairs",
-            }
-
             f.write(json.dumps(record) + "\n")
             count += 1
 
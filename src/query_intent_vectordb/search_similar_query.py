@@ -15,16 +15,15 @@ from typing import Any, Dict, List, Optional, Set
 import chromadb
 import sqlglot
 from pydantic import BaseModel
-from sentence_transformers import SentenceTransformer
 
 from ast_parsers.query_analyzer import analyze_query
+from query_intent_vectordb.embedding_model import get_embedding_model
 
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
 
 COLLECTION_NAME = "query_intents"
-EMBEDDING_MODEL = "all-MiniLM-L6-v2"
 CHROMA_PATH = Path(__file__).parents[1] / "chroma_db"
 
 
@@ -209,6 +208,19 @@ def select_diverse_examples_from_chroma_results(
     return selected[:max_examples]
 
 
+# ---------------------------------------------------------------------------
+# Embedding model
+# ---------------------------------------------------------------------------
+
+
+def preload_embedding_model() -> None:
+    """
+    Load the embedding model and run one encode ahead of time, so the first
+    retrieval (possibly from several threads at once) does not pay for it.
+    """
+    get_embedding_model().encode(["warm up"], show_progress_bar=False)
+
+
 # ---------------------------------------------------------------------------
 # Main retrieval function
 # ---------------------------------------------------------------------------
@@ -232,7 +244,7 @@ def find_similar_examples(
     #     logger.warning(f"SQL analysis failed: {e}")
 
     # Embed intent
-    model = SentenceTransformer(EMBEDDING_MODEL)
+    model = get_embedding_model()
     query_embedding = model.encode([intent], show_progress_bar=False).tolist()
 
     # Query ChromaDB (persistent client)
@@ -183,6 +183,29 @@ class TestSchemaValidation:
         
         assert result.valid is True
 
+    @pytest.mark.parametrize("sql", [
+        "SELECT id, name FROM users",
+        "SELECT * FROM non_existent_table",
+        "SELECT address FROM users",
+        "SELECT users.id, orders.amount FROM users JOIN orders ON users.id = orders.user_id",
+        "SELECT id FROM USERS",
+        "SELEC id FROM users",
+    ])
+    def test_compiled_schema_matches_dict_schema(self, sql):
+        """compile_schema() gives the same results as the plain dict schema."""
+        from ast_parsers.validator import compile_schema
+
+        compiled = compile_schema(TEST_SCHEMA)
+        expected = validate_schema(sql, schema=TEST_SCHEMA)
+        result = validate_schema(sql, schema=compiled)
+
+        assert result.valid == expected.valid
+        assert result.tags == expected.tags
+        assert result.error_messages == expected.error_messages
+
+        # Reusing the compiled schema gives the same result again
+        assert validate_schema(sql, schema=compiled).tags == expected.tags
+
 
 class TestValidateQuery:
     
@@ -680,5 +703,52 @@ class TestErrorContextPipeline:
         assert d["confidence"] == 0.95
 
 
+
+# =============================================================================
+# LLM Tool Validation Tests
+# =============================================================================
+
+class TestLlmToolValidation:
+    """Tests for the memoized validate_sql() used by the agent tool."""
+
+    def test_repeated_validation_hits_cache(self):
+        """The second identical call is served from the cache."""
+        from ast_parsers.llm_tool import _validate_sql_cached, validate_sql
+
+        _validate_sql_cached.cache_clear()
+        first = validate_sql("SELEC 1")
+        assert _validate_sql_cached.cache_info().misses == 1
+
+        second = validate_sql("SELEC 1")
+        info = _validate_sql_cached.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+        assert first == second
+        assert first[0].tag.startswith("syntax_")
+
+        validate_sql("SELEC 2")
+        assert _validate_sql_cached.cache_info().misses == 2
+
+    def test_cached_errors_are_not_shared(self):
+        """Mutating a returned error doesn't change later results."""
+        from ast_parsers.llm_tool import _validate_sql_cached, validate_sql
+
+        _validate_sql_cached.cache_clear()
+        errors = validate_sql("SELEC 1")
+        original_tag = errors[0].tag
+        errors[0].tag = "other"
+        errors[0].affected_clauses.append("WHERE")
+        errors.clear()
+
+        again = validate_sql("SELEC 1")
+        assert again[0].tag == original_tag
+        assert again[0].affected_clauses == []
+
+    def test_valid_sql_returns_empty_list(self):
+        """Valid SQL yields an empty (fresh) list."""
+        from ast_parsers.llm_tool import validate_sql
+
+        assert validate_sql("SELECT 1") == []
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])